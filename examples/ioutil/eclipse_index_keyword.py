@@ -0,0 +1,30 @@
+"""Read single keyword from a binary ECLIPSE file using a keyword index
+"""
+
+import roxar_api_utils.ioutil
+
+# --------------------------------------------------------
+# Script parameters
+
+# Input binary Eclipse file
+ecl_file = r'C:\Users\torb\MyData\Eclipse\CASE1\CASE1.UNRST'
+
+# Keyword and occurrence number, starting with 0
+keyword = 'PRESSURE'
+occurrence = 0
+
+# --------------------------------------------------------
+# Start script
+
+fp = open(ecl_file, 'rb')
+index = roxar_api_utils.ioutil.EclBinIndex(fp)
+print('Keywords found:', index.keys)
+print('Occurrences of', keyword, ':', index.count(keyword))
+
+data = index.get(keyword, occurrence)
+if data is not None:
+    print(keyword, 'min/max:', data.min(), data.max())
+
+del data
+index.close()
+fp.close()
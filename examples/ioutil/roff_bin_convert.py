@@ -21,13 +21,16 @@ infile = 'test.roff'
 # Output text file
 outfile = 'test.txt'
 
+# Only list structure of file, array data are not read
+header_only = False
+
 # --------------------------------------------------------
 # Start script
 
-reader = roxar_api_utils.ioutil.RoffReader(infile)
+reader = roxar_api_utils.ioutil.RoffReader(infile, aslist=True)
 with open(outfile, 'w') as fp:
     while True:
-        key, type, nval,val = reader.next_key()
+        key, type, nval,val = reader.next_key(lazy=header_only)
         if key is None:
             break
 
@@ -37,6 +40,6 @@ with open(outfile, 'w') as fp:
             print(type, file=fp)
         else:
             print(key, type, nval, file=fp)
-            if val is not None: print(val, file=fp)
+            if val is not None and not header_only: print(val, file=fp)
 
 print('Output to file', outfile)
@@ -1,13 +1,32 @@
+from .cell_to_ib import cell_to_ib
 from .comment_strip import comment_strip
+from .decode_char8 import decode_char8
+from .eclbincache import EclBinCache
+from .eclbinindex import EclBinIndex
 from .eclbinreader import EclBinReader
 from .eclbinwriter import EclBinWriter
+from .eclrestartindex import EclRestartIndex
 from .get_file_name_parts import get_file_name_parts
 from .ib_to_cell import ib_to_cell
+from .keydatacache import KeyDataCache
+from .keydataindex import KeyDataIndex
 from .keydatareader import KeyDataReader
 from .line_split import line_split
+from .load_roff_parameters import load_roff_parameters
 from .namealias import NameAlias
+from .open_roff_reader import open_roff_reader
 from .padblanc8 import padblanc8
+from .roff_parameter_stats import roff_parameter_stats
+from .roff_to_eclipse import roff_to_eclipse
+from .roffascreader import RoffAscLazyArray
+from .roffascreader import RoffAscReader
+from .roffgrid import RoffGrid
+from .roffindex import RoffIndex
+from .roffreader import RoffLazyArray
 from .roffreader import RoffReader
+from .roffwriter import RoffWriter
+from .scan_roff_parameters import scan_roff_parameters
+from .sidecarcache import SidecarCache
 from .string_to_datetime import string_to_datetime
 from .write_file_header import write_file_header
 
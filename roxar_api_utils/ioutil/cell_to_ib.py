@@ -0,0 +1,15 @@
+def cell_to_ib(ix, jy, kz, nx, ny, nz):
+    """Convert from (i,j,k) to cell number in Eclipse internal ordering, inverse of ib_to_cell
+    Args:
+        ix: Cell index in user coordinates, starting with 1 (int or Numpy array)
+        jy: Cell index in user coordinates, starting with 1 (int or Numpy array)
+        kz: Cell index in user coordinates, starting with 1 (int or Numpy array)
+        nx: Grid dimension (int)
+        ny: Grid dimension (int)
+        nz: Grid dimension (int)
+    Returns:
+        Cell number in Eclipse ordering, starting with 1
+    """
+    nxny = nx * ny
+
+    return ix + (jy - 1)*nx + (kz - 1)*nxny
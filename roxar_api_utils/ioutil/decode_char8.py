@@ -0,0 +1,26 @@
+def decode_char8(data, charmode='str'):
+    """Convert array of 8 character items from Eclipse binary file
+    Args:
+        data: Numpy S8 array
+        charmode (str): 'str' for list of strings, 'strip' for list of strings
+                        stripped for blanks, 'bytes' for the Numpy S8 array unchanged
+    Returns:
+        List of strings or Numpy S8 array
+    Raises:
+        ValueError if characters cannot be decoded as ascii
+    """
+
+    if charmode == 'bytes':
+        return data
+
+    try:
+        string = data.tobytes().decode('ascii')
+    except UnicodeDecodeError:
+        errstr = 'Cannot decode character as ascii. Incorrect file format?'
+        raise ValueError(errstr)
+
+    nchar = len(string)
+    if charmode == 'strip':
+        return [string[i:i+8].strip() for i in range(0, nchar, 8)]
+
+    return [string[i:i+8] for i in range(0, nchar, 8)]
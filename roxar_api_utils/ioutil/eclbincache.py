@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+
+from .decode_char8 import decode_char8
+from .eclbinreader import EclBinReader
+from .padblanc8 import padblanc8
+from .sidecarcache import SidecarCache
+
+class EclBinCache(SidecarCache):
+    """Cache of decoded Eclipse binary files, stored as Numpy arrays in a sidecar folder
+    Args:
+        cachedir (str): Folder for cache storage, created if missing
+        maxsize (int): Optional maximum cache size in bytes.  Default 2 GB.
+        validate (str): Check of cached files, mtime for size and modification time, hash for content hash
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Note:
+        Each cached file has a sub folder with a JSON manifest and one 2-D .npy file for each keyword,
+        with one row for each occurrence of the keyword with the same data type and length.
+        Repeated keywords, e.g. PARAMS in summary files, are read from a single memory map.
+        Least recently used entries are removed when the cache exceeds maxsize.
+    """
+
+    _format = 2
+
+    def __init__(self, cachedir, maxsize=2*1024**3, validate='mtime', errfile=None):
+
+        super().__init__(cachedir, maxsize, validate, errfile)
+
+    def _store(self, filename, tmpdir):
+        """Decode source file and store keywords in entry folder
+        Returns:
+            Dictionary with manifest items
+        """
+
+        with open(filename, 'rb') as fp:
+            reader = EclBinReader(fp, self._errfile, asarray=True, charmode='bytes')
+            headers = list(reader.iter_headers())
+
+            # Group occurrences of keyword with same data type and length, one row each
+            keywords = []
+            groups = []
+            lookup = dict()
+            for key, nval, ktype, offset in headers:
+                if ktype == 'MESS':
+                    keywords.append([key, 0, ktype, None, 0])
+                    continue
+                igroup = lookup.get((key, ktype, nval))
+                if igroup is None:
+                    igroup = len(groups)
+                    lookup[(key, ktype, nval)] = igroup
+                    groups.append([None, None, 0, nval])
+                keywords.append([key, nval, ktype, igroup, groups[igroup][2]])
+                groups[igroup][2] += 1
+
+            arrays = [None]*len(groups)
+            nbytes = 0
+            for (key, nval, ktype, offset), entry in zip(headers, keywords):
+                igroup, row = entry[3:5]
+                if igroup is None:
+                    continue
+                fp.seek(offset)
+                nval, item = reader.readdata(key, nval, ktype)
+                group = groups[igroup]
+                if group[1] is None:
+                    group[1] = item.dtype.str
+                    if nval > 0:
+                        group[0] = str(igroup) + '.npy'
+                        arrays[igroup] = np.lib.format.open_memmap(
+                            os.path.join(tmpdir, group[0]), mode='w+',
+                            dtype=item.dtype, shape=(group[2], nval))
+                        nbytes += arrays[igroup].nbytes
+                if arrays[igroup] is not None:
+                    arrays[igroup][row] = item
+
+        for array in arrays:
+            if array is not None:
+                array.flush()
+        del arrays
+
+        return {'nbytes': nbytes, 'groups': groups, 'keywords': keywords}
+
+    def iter_keywords(self, filename, select=None, asarray=False, charmode='str'):
+        """Iterate over keywords in Eclipse binary file, using cached data
+        Args:
+            filename (str): Eclipse binary file name
+            select: Optional collection of keywords to read.  All keywords if None.
+            asarray (bool): Numeric data as memory mapped Numpy arrays if True, else lists
+            charmode (str): Format for character data, see EclBinReader
+        Yields:
+            Tuple with key, number of values, data type, and data
+        """
+
+        entrydir = self._entry_dir(filename)
+        manifest = self.load(filename)
+
+        selected = None
+        if select is not None:
+            selected = set(padblanc8(skey) for skey in select)
+
+        arrays = dict()
+        for key, nval, ktype, igroup, row in manifest['keywords']:
+            if selected is not None and key not in selected:
+                continue
+
+            item = None
+            if igroup is not None:
+                if igroup not in arrays:
+                    arrays[igroup] = self._load_group(entrydir, manifest['groups'][igroup])
+                item = arrays[igroup][row]
+                if ktype == 'CHAR':
+                    item = decode_char8(item, charmode)
+                elif not asarray:
+                    item = item.tolist()
+
+            yield (key, nval, ktype, item)
+
+    def _load_group(self, entrydir, group):
+        """Load 2-D array for keyword group as read-only memory map
+        """
+
+        npyname, dtype, nrows, nval = group
+        if npyname is None:
+            return np.empty((nrows, 0), dtype=np.dtype(dtype))
+
+        return np.load(os.path.join(entrydir, npyname), mmap_mode='r')
+
+    def get_stacked(self, filename, key):
+        """Get all occurrences of keyword as one 2-D array, using cached data
+        Args:
+            filename (str): Eclipse binary file name
+            key (str): Eclipse keyword, e.g. PARAMS
+        Returns:
+            Memory mapped Numpy array (occurrences x values), or None if keyword not found
+            or occurrences differ in data type or length
+        """
+
+        entrydir = self._entry_dir(filename)
+        manifest = self.load(filename)
+
+        skey = padblanc8(key)
+        igroups = set(entry[3] for entry in manifest['keywords'] if entry[0] == skey)
+        if len(igroups) != 1 or None in igroups:
+            return None
+
+        return self._load_group(entrydir, manifest['groups'][igroups.pop()])
@@ -0,0 +1,216 @@
+import mmap
+import sys
+
+import numpy as np
+
+from .eclbinreader import EclBinReader
+from .padblanc8 import padblanc8
+
+class EclBinIndex:
+    """Keyword index for Eclipse binary file, with data access from a memory map
+    Args:
+        binfile: File pointer for binary file opened for read
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Note:
+        The keyword headers are scanned once, data are not decoded.
+        Data are returned in file byte order.  Keywords stored in a single record
+        are returned as read-only views of the memory map, without copying.
+    """
+
+    def __init__(self, binfile, errfile=None):
+
+        self._binfile = binfile
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+
+        self._reader = EclBinReader(binfile, errfile)
+
+        # Index entries: (key, occurrence, data type, number of values, byte offset)
+        self._index = []
+        self._lookup = dict()
+        self._scan()
+
+        self._mmap = None
+        if binfile.seek(0, 2) > 0:
+            self._mmap = mmap.mmap(binfile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        for entry in self._index:
+            yield entry
+
+    def __len__(self):
+        return len(self._index)
+
+    def _scan(self):
+        """Scan keyword headers in file and store index entries
+        Raises:
+            ValueError if incorrect data type found in file
+        """
+
+        counts = dict()
+        for key, nval, ktype, offset in self._reader.iter_headers():
+            occ = counts.get(key, 0)
+            counts[key] = occ + 1
+            if ktype == 'MESS':
+                nval = 0
+
+            self._lookup[(key, occ)] = len(self._index)
+            self._index.append((key, occ, ktype, nval, offset))
+
+        return None
+
+    def _get_keys(self):
+        keys = []
+        for entry in self._index:
+            if entry[1] == 0:
+                keys.append(entry[0])
+        return keys
+
+    keys = property(_get_keys, doc='Get list of unique keywords in file order')
+
+    def count(self, key):
+        """Get number of occurrences of keyword
+        Args:
+            key (str): Eclipse keyword
+        Returns:
+            Number of occurrences in file
+        """
+
+        skey = padblanc8(key)
+        nocc = 0
+        while (skey, nocc) in self._lookup:
+            nocc += 1
+
+        return nocc
+
+    def find(self, key, occurrence=0):
+        """Find index entry for keyword
+        Args:
+            key (str): Eclipse keyword
+            occurrence (int): Occurrence number of keyword, starting with 0
+        Returns:
+            Tuple with key, occurrence, data type, number of values and byte offset, or None if not found
+        """
+
+        ind = self._lookup.get((padblanc8(key), occurrence))
+        if ind is None:
+            return None
+
+        return self._index[ind]
+
+    def get(self, key, occurrence=0):
+        """Get data for keyword
+        Args:
+            key (str): Eclipse keyword
+            occurrence (int): Occurrence number of keyword, starting with 0
+        Returns:
+            Numpy array with data in file byte order, or None if keyword not found or no data
+        """
+
+        entry = self.find(key, occurrence)
+        if entry is None:
+            return None
+
+        return self.get_entry(entry)
+
+    def get_entry(self, entry):
+        """Get data for index entry
+        Args:
+            entry (tuple): Index entry, as returned by find or iteration
+        Returns:
+            Numpy array with data in file byte order, or None if no data
+        """
+
+        key, occ, ktype, nval, offset = entry
+        dtype, blength = self._reader.data_layout(ktype)
+        if dtype is None or nval <= 0:
+            return None
+
+        size = dtype.itemsize
+        if nval <= blength:
+            return np.frombuffer(self._mmap, dtype=dtype, count=nval, offset=offset + 4)
+
+        # Multiple records: strided view of full records, then copy in one operation
+        nfull = nval // blength
+        rlength = blength*size + 8
+        blocks = np.ndarray(
+            shape=(nfull, blength),
+            dtype=dtype,
+            buffer=self._mmap,
+            offset=offset + 4,
+            strides=(rlength, size))
+
+        data = np.empty(nval, dtype=dtype)
+        data[0:nfull*blength].reshape(nfull, blength)[:] = blocks
+        nrest = nval - nfull*blength
+        if nrest > 0:
+            data[nfull*blength:] = np.frombuffer(
+                self._mmap, dtype=dtype, count=nrest, offset=offset + nfull*rlength + 4)
+
+        return data
+
+    def get_values(self, key, positions, occurrence=0):
+        """Get data values at given positions in keyword array
+        Args:
+            key (str): Eclipse keyword
+            positions: Sequence or Numpy array of positions in keyword array, starting with 0
+            occurrence (int): Occurrence number of keyword, starting with 0
+        Returns:
+            Numpy array with values in file byte order, or None if keyword not found or no data
+        """
+
+        entry = self.find(key, occurrence)
+        if entry is None:
+            return None
+
+        return self.get_entry_values(entry, positions)
+
+    def get_entry_values(self, entry, positions):
+        """Get data values at given positions for index entry, without reading the whole array
+        Args:
+            entry (tuple): Index entry, as returned by find or iteration
+            positions: Sequence or Numpy array of positions in keyword array, starting with 0
+        Returns:
+            Numpy array with values in file byte order, or None if no data
+        Raises:
+            ValueError if position outside keyword array
+        """
+
+        key, occ, ktype, nval, offset = entry
+        dtype, blength = self._reader.data_layout(ktype)
+        if dtype is None or nval <= 0:
+            return None
+
+        positions = np.asarray(positions, dtype=np.int64)
+        if positions.size > 0 and (positions.min() < 0 or positions.max() >= nval):
+            errstr = 'Position outside data for keyword ' + key
+            raise ValueError(errstr)
+
+        # Byte position of each value, skipping record markers
+        size = dtype.itemsize
+        rlength = blength*size + 8
+        iblk = positions // blength
+        pbytes = offset + 4 + iblk*rlength + (positions - iblk*blength)*size
+
+        buf = np.frombuffer(self._mmap, dtype=np.uint8)
+        raw = buf[pbytes.reshape(-1, 1) + np.arange(size)]
+
+        return raw.view(dtype).reshape(positions.shape)
+
+    def close(self):
+        """Close memory map
+        Raises:
+            ValueError if arrays returned as views are still in use
+        """
+
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                errstr = 'Cannot close memory map, arrays from index still in use'
+                raise ValueError(errstr)
+            self._mmap = None
+
+        return None
@@ -1,22 +1,33 @@
 import struct
 import sys
 
+import numpy as np
+
+from .decode_char8 import decode_char8
+from .padblanc8 import padblanc8
+
 class EclBinReader:
     """Base class for reading Eclipse binary file
     Args:
         binfile: File pointer for binary file opened for read
         errfile: Optional file pointer for file opened for error messages.  Default standard output.
+        asarray: Optional flag, numeric data returned as Numpy arrays if True.  Default lists.
+        charmode: Optional format for character data: 'str' for list of strings (default),
+                  'strip' for list of strings stripped for blanks, 'bytes' for Numpy S8 array.
     Note:
         Endian check included for windows/linux.
+        Numeric data are read one record at a time and decoded by Numpy.
     """
 
-    def __init__(self, binfile, errfile=None):
+    def __init__(self, binfile, errfile=None, asarray=False, charmode='str'):
 
         self._binfile = binfile
 
         if errfile is None:
             errfile = sys.stdout
         self._errfile = errfile
+        self._asarray = asarray
+        self._set_charmode(charmode)
 
 # Format statement for endian reading
 
@@ -27,11 +38,13 @@ class EclBinReader:
             self._iform = '>i'
             self._fform = '>f'
             self._dform = '>d'
+            self._endian = '>'
 
         elif val2 < 20:
             self._iform = '<i'
             self._fform = '<f'
             self._dform = '<d'
+            self._endian = '<'
 
         else:
             errstr = 'Byte-swap test failed ' + str(val1) + ' ' + str(val2)
@@ -47,25 +60,123 @@ class EclBinReader:
         self._blkq = 1000
         self._blkc = 105
 
-    def _read_nchar(self, nval):
-        """Read nv characters from file
+# Numpy data type in file byte order, and block size, for each data type
+        self._layout = {
+            'INTE': (np.dtype(self._endian + 'i4'), self._blki),
+            'REAL': (np.dtype(self._endian + 'f4'), self._blkf),
+            'DOUB': (np.dtype(self._endian + 'f8'), self._blkd),
+            'LOGI': (np.dtype(self._endian + 'i4'), self._blkq),
+            'CHAR': (np.dtype('S8'), self._blkc),
+            'MESS': (None, 0)}
+
+    def _get_asarray(self):
+        return self._asarray
+
+    def _set_asarray(self, asarray=True):
+        self._asarray = asarray
+        return None
+
+    def _get_charmode(self):
+        return self._charmode
+
+    def _set_charmode(self, charmode='str'):
+        if charmode not in ('str', 'strip', 'bytes'):
+            errstr = 'Incorrect format for character data: ' + str(charmode)
+            raise ValueError(errstr)
+        self._charmode = charmode
+        return None
+
+    asarray = property(_get_asarray, _set_asarray, doc='Get/set flag for numeric data as Numpy arrays')
+    charmode = property(_get_charmode, _set_charmode, doc='Get/set format for character data')
+
+    def _read_array(self, nval, dtype):
+        """Read nval values of fixed length type, one Fortran record at a time
         Args:
-            nv - int - Number of characters
+            nval: Values to be read
+            dtype: Numpy data type, in file byte order
+        Returns:
+            Numpy array of nval values, in native byte order
+        Raises:
+            ValueError if end of file or incorrect record length found
         """
-        item = ''
-        for itr in range(0, nval):
-            cval = self._binfile.read(1)
-            if not cval:
-                break
-            try:
-                ccc = cval.decode('ascii')
-            except:
-                errstr = 'Cannot decode character as ascii. Incorrect file format?'
+
+        data = np.empty(nval, dtype=dtype)
+        buf = memoryview(data.view(np.uint8))
+        nbytes = data.nbytes
+        ibeg = 0
+        while ibeg < nbytes:
+            cval = self._binfile.read(4)
+            if len(cval) < 4:
+                raise ValueError('Unexpected end of file reading data')
+            nrec = struct.unpack(self._iform, cval)[0]
+            if nrec <= 0 or ibeg + nrec > nbytes:
+                errstr = 'Incorrect record length found: ' + str(nrec)
                 raise ValueError(errstr)
+            if self._binfile.readinto(buf[ibeg:ibeg + nrec]) < nrec:
+                raise ValueError('Unexpected end of file reading data')
+            self._binfile.read(4)
+            ibeg += nrec
+
+        return data.astype(data.dtype.newbyteorder('='), copy=False)
+
+    def data_layout(self, ktype):
+        """Get storage layout for data type
+        Args:
+            ktype: Eclipse data type (INTE, REAL, ...)
+        Returns:
+            Tuple with Numpy data type in file byte order and number of values per record
+        Raises:
+            ValueError if incorrect data type
+        """
 
-            item += ccc
+        try:
+            return self._layout[ktype]
+        except KeyError:
+            errstr = 'Incorrect data type found: ' + str(ktype)
+            raise ValueError(errstr)
 
-        return item
+    def data_size(self, nval, ktype):
+        """Get number of bytes in file for data of keyword, including record markers
+        Args:
+            nval: Number of values
+            ktype: Eclipse data type
+        Returns:
+            Number of bytes
+        Raises:
+            ValueError if incorrect data type
+        """
+
+        dtype, blength = self.data_layout(ktype)
+        if dtype is None or nval <= 0:
+            return 0
+
+        nblk = (nval + blength - 1) // blength
+        return nval*dtype.itemsize + 8*nblk
+
+    def skipdata(self, nval, ktype):
+        """Skip data for keyword, without reading the data
+        Args:
+            nval: Number of values
+            ktype: Eclipse data type
+        Returns:
+            Number of bytes skipped
+        Raises:
+            ValueError if incorrect data type
+        """
+
+        nbytes = self.data_size(nval, ktype)
+        if nbytes > 0:
+            self._binfile.seek(nbytes, 1)
+
+        return nbytes
+
+    def _as_output(self, data):
+        """Return data as Numpy array or list, depending on the asarray flag
+        """
+
+        if self._asarray:
+            return data
+        return data.tolist()
 
     def readkey(self):
         """Read keyword line from file.
@@ -73,153 +184,99 @@ class EclBinReader:
             Tuple with Eclipse keyword as string, number of data values, and data type.
         """
 
-        cval = self._binfile.read(4)
+        cval = self._binfile.read(24)
         if not cval:
             return (None, None, None)
+        if len(cval) < 24:
+            raise ValueError('Unexpected end of file reading keyword')
+
+        try:
+            key = cval[4:12].decode('ascii')
+            ktype = cval[16:20].decode('ascii')
+        except UnicodeDecodeError:
+            errstr = 'Cannot decode character as ascii. Incorrect file format?'
+            raise ValueError(errstr)
 
-        key = self._read_nchar(8)
+        nval = struct.unpack(self._iform, cval[12:16])[0]
 
-        cnval = self._binfile.read(4)
-        nval = struct.unpack(self._iform, cnval)[0]
+        return (key, nval, ktype)
 
-        ktype = self._read_nchar(4)
+    def iter_headers(self):
+        """Iterate over keyword headers in file, skipping the data without reading it
+        Yields:
+            Tuple with key, number of values, data type, and byte offset of data
+        Raises:
+            ValueError if incorrect data type found in file
+        Note:
+            The file position is moved to the next header when the next item is requested.
+        """
 
-        self._binfile.read(4)
+        while True:
+            key, nval, ktype = self.readkey()
+            if not key:
+                return
 
-        return (key, nval, ktype)
+            offset = self._binfile.tell()
+            nbytes = self.data_size(nval, ktype)
+            yield (key, nval, ktype, offset)
+            self._binfile.seek(offset + nbytes)
 
     def readchar(self, nval):
         """Read multiple character items from file
         Args:
             nval: Values to be read
         Returns:
-            List of nval string items
+            List of nval string items, or Numpy S8 array, depending on charmode
+        Raises:
+            ValueError if characters cannot be decoded as ascii
         """
 
-        items = []
-        ival = 0
-        for itr in range(0, nval):
-            if ival == 0:
-                self._binfile.read(4)
-            dat = self._read_nchar(8)
-            items.append(dat)
-            ival += 1
-            if ival == self._blkc:
-                self._binfile.read(4)
-                ival = 0
-
-        if ival > 0:
-            self._binfile.read(4)
-
-        return items
+        data = self._read_array(nval, 'S8')
+        return decode_char8(data, self._charmode)
 
     def readint(self, nval):
         """Read multiple integer values from file
         Args:
             nval: Values to be read
         Returns:
-            List of nval integers
+            List or Numpy array of nval integers
         """
 
-        items = []
-        ival = 0
-        for itr in range(0, nval):
-            if ival == 0:
-                self._binfile.read(4)
-            cdat = self._binfile.read(4)
-            dat = struct.unpack(self._iform, cdat)[0]
-            items.append(dat)
-            ival += 1
-            if ival == self._blki:
-                self._binfile.read(4)
-                ival = 0
-
-        if ival > 0:
-            self._binfile.read(4)
-
-        return items
+        data = self._read_array(nval, self._endian + 'i4')
+        return self._as_output(data)
 
     def readfloat(self, nval):
         """Read multiple float values from file
         Args:
             nval: Values to be read
         Returns:
-            List of nval floats
+            List or Numpy array of nval floats
         """
 
-        items = []
-        ival = 0
-        for itr in range(0, nval):
-            if ival == 0:
-                self._binfile.read(4)
-            cdat = self._binfile.read(4)
-            dat = struct.unpack(self._fform, cdat)[0]
-            items.append(dat)
-            ival += 1
-            if ival == self._blkf:
-                self._binfile.read(4)
-                ival = 0
-
-        if ival > 0:
-            self._binfile.read(4)
-
-        return items
+        data = self._read_array(nval, self._endian + 'f4')
+        return self._as_output(data)
 
     def readdouble(self, nval):
         """Read nval double values from file
         Args:
             nval: Values to be read
         Returns:
-            List of nval doubles
+            List or Numpy array of nval doubles
         """
 
-        items = []
-        ival = 0
-        for itr in range(0, nval):
-            if ival == 0:
-                self._binfile.read(4)
-            cdat = self._binfile.read(8)
-            dat = struct.unpack(self._dform, cdat)[0]
-            items.append(dat)
-            ival += 1
-            if ival == self._blkd:
-                self._binfile.read(4)
-                ival = 0
-
-        if ival > 0:
-            self._binfile.read(4)
-
-        return items
+        data = self._read_array(nval, self._endian + 'f8')
+        return self._as_output(data)
 
     def readlogi(self, nval):
         """Read nval boolean values from file
         Args:
             nval: Values to be read
         Returns:
-            List of nval boolean values
+            List or Numpy array of nval boolean values
         """
 
-        items = []
-        ival = 0
-        for itr in range(0, nval):
-            if ival == 0:
-                self._binfile.read(4)
-            cdat = self._binfile.read(4)
-            dat = struct.unpack(self._iform, cdat)[0]
-            if dat == 0:
-                tdat = False
-            else:
-                tdat = True
-            items.append(tdat)
-            ival += 1
-            if ival == self._blkq:
-                self._binfile.read(4)
-                ival = 0
-
-        if ival > 0:
-            self._binfile.read(4)
-
-        return items
+        data = self._read_array(nval, self._endian + 'i4')
+        return self._as_output(data != 0)
 
     def readnextkey(self):
         """Read data for next keyword
@@ -233,6 +290,22 @@ class EclBinReader:
         if not key:
             return None
 #       print('string :', key, ' ', nval, ' ', ktype)
+        nval, item = self.readdata(key, nval, ktype)
+
+        return (key, nval, ktype, item)
+
+    def readdata(self, key, nval, ktype):
+        """Read data for keyword, after the keyword line has been read
+        Args:
+            key: Eclipse keyword, used in error messages
+            nval: Number of values
+            ktype: Eclipse data type
+        Returns:
+            Tuple with number of values and data list, None for MESS
+        Raises:
+            ValueError if incorrect data type
+        """
+
         if ktype == 'CHAR':
             item = self.readchar(nval)
         elif ktype == 'INTE':
@@ -250,7 +323,52 @@ class EclBinReader:
             errstr = 'Incorrect data type found: ' + ktype + ', keyword ' + key
             raise ValueError(errstr)
 
-        return (key, nval, ktype, item)
+        return (nval, item)
+
+    def iter_keywords(self, select=None):
+        """Iterate over keywords in file, reading data for selected keywords only
+        Args:
+            select: Optional collection of keywords to read.  All keywords if None.
+        Yields:
+            Tuple with key, number of values, data type, and data list
+        Raises:
+            ValueError if incorrect data type found in file
+        Note:
+            Data for keywords not selected are skipped without reading.
+        """
+
+        selected = None
+        if select is not None:
+            selected = set(padblanc8(skey) for skey in select)
+
+        for key, nval, ktype, offset in self.iter_headers():
+            if selected is None or key in selected:
+                nval, item = self.readdata(key, nval, ktype)
+                yield (key, nval, ktype, item)
+
+    def read_keywords(self, callback, select=None):
+        """Read keywords in file and pass data for each selected keyword to callback function
+        Args:
+            callback: Function called with key, number of values, data type, and data list.
+                      Reading stops if the function returns False.
+            select: Optional collection of keywords to read.  All keywords if None.
+        Returns:
+            Number of keywords passed to callback function
+        Raises:
+            ValueError if incorrect data type found in file
+        Note:
+            Only data for one keyword is kept in memory at a time.
+        """
+
+        nokeys = 0
+        for key, nval, ktype, item in self.iter_keywords(select):
+            nokeys += 1
+            cont = callback(key, nval, ktype, item)
+            del item
+            if cont is False:
+                break
+
+        return nokeys
 
     def list_all(self, outfile=None):
         """List keywords in a binary ECLIPSE file
@@ -258,80 +376,73 @@ class EclBinReader:
             outfile (file pointer): Opened file for output
         Raises:
             ValueError if incorrect data type found in file
+        Note:
+            Only the keyword headers are read, the data are skipped.
         """
 
         if outfile is None:
             outfile = sys.stdout
 
-        while True:
-            key, nval, ktype = self.readkey()
-            if not key:
-                return None
+        for key, nval, ktype, offset in self.iter_headers():
             print(key, nval, ktype, file=outfile)
-            if ktype == 'CHAR':
-                item = self.readchar(nval)
-            elif ktype == 'INTE':
-                item = self.readint(nval)
-            elif ktype == 'REAL':
-                item = self.readfloat(nval)
-            elif ktype == 'DOUB':
-                item = self.readdouble(nval)
-            elif ktype == 'LOGI':
-                item = self.readlogi(nval)
-            elif ktype == 'MESS':
-                nval = 0
-                item = None
-            else:
-                errstr = 'Incorrect data type found: ' + ktype + ', keyword ' + key
-                raise ValueError(errstr)
-
-            del item
 
         return None
 
-    def print_all(self, outfile=None):
+    def print_all(self, outfile=None, precision=None, header_only=False):
         """Convert an Eclipse binary file to a text file
         Args:
             outfile (file pointer): Open file for output
+            precision (int): Optional number of significant digits for REAL and DOUB data.
+                             Full precision if None.
+            header_only (bool): Only keyword lines written if True, see list_all
         Raises:
             ValueError if incorrect data type found in file
+        Note:
+            Data are written 10 values per line, formatted and written in large chunks.
         """
 
         if outfile is None:
             outfile = sys.stdout
 
-        while True:
-            key, nval, ktype = self.readkey()
-            if not key:
-                return None
-#            print(key, nval, ktype)
-            print(key, nval, ktype, file=outfile)
-            if ktype == 'CHAR':
-                item = self.readchar(nval)
-            elif ktype == 'INTE':
-                item = self.readint(nval)
-            elif ktype == 'REAL':
-                item = self.readfloat(nval)
-            elif ktype == 'DOUB':
-                item = self.readdouble(nval)
-            elif ktype == 'LOGI':
-                item = self.readlogi(nval)
-            elif ktype == 'MESS':
-                nval = 0
-                item = None
-            else:
-                errstr = 'Incorrect data type found: ' + ktype + ', keyword ' + key
-                raise ValueError(errstr)
+        if header_only:
+            return self.list_all(outfile)
 
+        for key, nval, ktype, offset in self.iter_headers():
+            print(key, nval, ktype, file=outfile)
+            nval, item = self.readdata(key, nval, ktype)
             if nval > 0:
-                ibeg = 0
-                while ibeg < nval:
-                    iend = min(ibeg + 10, nval)
-                    for j in range(ibeg, iend):
-                        print(item[j], '  ', end='', file=outfile)
-                    ibeg = iend
-                    print(file=outfile)
+                self._write_values(outfile, item, ktype, precision)
 
             del item
 
         return None
+
+    def _write_values(self, outfile, item, ktype, precision=None):
+        """Write data values as text, 10 values per line
+        Args:
+            outfile (file pointer): Open file for output
+            item: Data list or Numpy array
+            ktype: Eclipse data type
+            precision (int): Optional number of significant digits for REAL and DOUB data
+        """
+
+        if isinstance(item, np.ndarray):
+            item = item.tolist()
+
+        vform = '%s   '
+        if precision is not None and ktype in ('REAL', 'DOUB'):
+            vform = '%.' + str(precision) + 'g   '
+
+        nrow = 10
+        nchunk = 1000*nrow
+        rowform = vform*nrow + '\n'
+        nval = len(item)
+        nfull = (nval // nrow)*nrow
+        for ibeg in range(0, nfull, nchunk):
+            iend = min(ibeg + nchunk, nfull)
+            outfile.write(rowform*((iend - ibeg) // nrow) % tuple(item[ibeg:iend]))
+
+        if nfull < nval:
+            outfile.write(vform*(nval - nfull) % tuple(item[nfull:]) + '\n')
+
+        return None
@@ -1,6 +1,8 @@
 import struct
 import sys
 
+import numpy as np
+
 from .padblanc8 import padblanc8
 
 class EclBinWriter:
@@ -10,6 +12,8 @@ class EclBinWriter:
         errfile: Optional file pointer for file opened for error messages.  Default standard output.
     Note:
         Endian check included for windows/linux.
+        Data are written from Numpy arrays, one record per block, through an internal buffer.
+        The buffer is flushed after each keyword.
     """
 
     def __init__(self, binfile, errfile=None):
@@ -32,6 +36,40 @@ class EclBinWriter:
         self._blkq = 1000
         self._blkc = 105
 
+# Internal write buffer, flushed when exceeding buffer size and after each keyword
+        self._buffer = bytearray()
+        self._bufsize = 4*1024*1024
+
+    def flush(self):
+        """Write content of internal buffer to file
+        """
+
+        if len(self._buffer) > 0:
+            self._binfile.write(self._buffer)
+            self._buffer = bytearray()
+
+        return None
+
+    def _write_blocks(self, data, blength):
+        """Write data array as records of blength values, each framed by record markers
+        Args:
+            data: Numpy array in file byte order
+            blength: Number of values per record
+        """
+
+        buf = self._buffer
+        for ibeg in range(0, data.shape[0], blength):
+            block = data[ibeg:ibeg + blength]
+            marker = struct.pack(self._iform, block.nbytes)
+            buf += marker
+            buf += block.tobytes()
+            buf += marker
+            if len(buf) >= self._bufsize:
+                self.flush()
+                buf = self._buffer
+
+        return None
+
     def write_key(self, key, nval, ktype):
         """Write keyword line to file.
         Args:
@@ -44,11 +82,13 @@ class EclBinWriter:
 
         try:
             skey = padblanc8(key)
-            self._binfile.write(struct.pack(self._iform, 16))
-            self._binfile.write(skey.encode('ascii'))
-            self._binfile.write(struct.pack(self._iform, nval))
-            self._binfile.write(ktype.encode('ascii'))
-            self._binfile.write(struct.pack(self._iform, 16))
+            marker = struct.pack(self._iform, 16)
+            self._buffer += marker
+            self._buffer += skey.encode('ascii')
+            self._buffer += struct.pack(self._iform, nval)
+            self._buffer += ktype.encode('ascii')
+            self._buffer += marker
+            self.flush()
         except:
             errstr = 'Cannot write keyword ' + key
             raise IOError(errstr)
@@ -58,9 +98,10 @@ class EclBinWriter:
     def write_data(self, key, dval, nval, ktype):
         """Write data items to file
         Args:
-            nval: Values to be read
-        Returns:
-            List of nval string items
+            key (char): Keyword, used in error messages
+            dval: Data values as list, Numpy array or memoryview
+            nval (int): Number of values to be written
+            ktype (char): Keyword type (INTE, REAL, DOUB, LOGI, CHAR, MESS)
         Note:
             No check on character length
         """
@@ -71,89 +112,43 @@ class EclBinWriter:
 
         try:
             if ktype == 'CHAR':
+                if isinstance(dval, np.ndarray) and dval.dtype.kind == 'S':
+                    data = np.char.ljust(np.asarray(dval[0:nval], dtype='S8'), 8)
+                else:
+                    data = np.frombuffer(''.join(dval[0:nval]).encode('ascii'), dtype='S8')
                 blength = self._blkc
 
-                nblk = int(nval/blength)
-                if nblk*blength < nval:
-                    nblk = nblk + 1
-                for ib in range(0, nblk):
-                    ibeg = ib*blength
-                    iend = min(ibeg + blength, nval)
-                    nv = iend - ibeg
-                    self._binfile.write(struct.pack(self._iform, nv*8))
-                    for iv in range(nv):
-                        self._binfile.write(dval[ibeg+iv].encode('ascii'))
-                    self._binfile.write(struct.pack(self._iform, nv*8))
-
             elif ktype == 'INTE':
+                data = np.asarray(dval[0:nval], dtype=self._iform)
                 blength = self._blki
 
-                nblk = int(nval/blength)
-                if nblk*blength < nval:
-                    nblk = nblk + 1
-                for ib in range(0, nblk):
-                    ibeg = ib*blength
-                    iend = min(ibeg + blength, nval)
-                    nv = iend - ibeg
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-                    for iv in range(nv):
-                        self._binfile.write(struct.pack(self._iform, dval[ibeg+iv]))
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-
             elif ktype == 'REAL':
+                data = np.asarray(dval[0:nval], dtype=self._fform)
                 blength = self._blkf
 
-                nblk = int(nval/blength)
-                if nblk*blength < nval:
-                    nblk = nblk + 1
-                for ib in range(0, nblk):
-                    ibeg = ib*blength
-                    iend = min(ibeg + blength, nval)
-                    nv = iend - ibeg
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-                    for iv in range(nv):
-                        self._binfile.write(struct.pack(self._fform, dval[ibeg+iv]))
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-
             elif ktype == 'DOUB':
+                data = np.asarray(dval[0:nval], dtype=self._dform)
                 blength = self._blkd
 
-                nblk = int(nval/blength)
-                if nblk*blength < nval:
-                    nblk = nblk + 1
-                for ib in range(0, nblk):
-                    ibeg = ib*blength
-                    iend = min(ibeg + blength, nval)
-                    nv = iend - ibeg
-                    self._binfile.write(struct.pack(self._iform, nv*8))
-                    for iv in range(nv):
-                        self._binfile.write(struct.pack(self._dform, dval[ibeg+iv]))
-                    self._binfile.write(struct.pack(self._iform, nv*8))
             elif ktype == 'LOGI':
+                data = np.asarray(dval[0:nval], dtype=bool).astype(self._iform)
                 blength = self._blkq
 
-                nblk = int(nval/blength)
-                if nblk*blength < nval:
-                    nblk = nblk + 1
-                for ib in range(0, nblk):
-                    ibeg = ib*blength
-                    iend = min(ibeg + blength, nval)
-                    nv = iend - ibeg
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-                    for iv in range(nv):
-                        lval = 0
-                        if dval[ibeg+iv]:
-                            lval = 1
-                        self._binfile.write(struct.pack(self._iform, lval))
-                    self._binfile.write(struct.pack(self._iform, nv*4))
-
             elif ktype == 'MESS':
-                pass
+                data = None
             else:
                 errstr = 'Incorrect data ktype ' + ktype + ' for keyword ' + key
                 raise ValueError(errstr)
 
+            if data is not None:
+                if data.shape[0] != nval:
+                    errstr = 'Incorrect number of data items for keyword ' + key
+                    raise ValueError(errstr)
+                self._write_blocks(data, blength)
+                self.flush()
+
         except:
+            self._buffer = bytearray()
             errstr = 'Cannot write data for keyword ' + key
             raise IOError(errstr)
 
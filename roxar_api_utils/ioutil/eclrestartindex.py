@@ -0,0 +1,266 @@
+import re
+import sys
+
+import numpy as np
+
+from .cell_to_ib import cell_to_ib
+from .eclbinindex import EclBinIndex
+from .get_file_name_parts import get_file_name_parts
+from .padblanc8 import padblanc8
+
+class EclRestartIndex:
+    """Report step index for Eclipse restart files
+    Args:
+        binfile: File pointer for unified restart file opened for read,
+                 or list of file pointers for non-unified restart files
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Raises:
+        ValueError if report step not found for a file, or found more than once
+    Note:
+        Keywords are mapped to the report step given by the preceding SEQNUM keyword.
+        Only global grid data are indexed, keywords in LGR to ENDLGR sections are skipped.
+        The first occurrence of a keyword within a report step is used.
+        Files without SEQNUM get the report step from the file suffix, e.g. 5 for CASE.X0005.
+        Data are read from memory maps and returned in file byte order.
+    """
+
+    def __init__(self, binfile, errfile=None):
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+
+        if isinstance(binfile, (list, tuple)):
+            binfiles = binfile
+        else:
+            binfiles = [binfile]
+
+        self._indices = []
+        self._names = []
+        for fp in binfiles:
+            self._indices.append(EclBinIndex(fp, errfile))
+            self._names.append(getattr(fp, 'name', None))
+
+        # Keyword index and index entry for each report step, by keyword
+        self._steps = []
+        self._entries = dict()
+        self._scan()
+
+    def _scan(self):
+        """Map keywords to report steps, keywords before first SEQNUM and in LGR sections are ignored
+        Raises:
+            ValueError if report step not found for a file, or found more than once
+        """
+
+        for binindex, name in zip(self._indices, self._names):
+            step = None
+            if binindex.count('SEQNUM') == 0:
+                step = self._file_step(name)
+                self._add_step(step)
+
+            inlgr = False
+            for entry in binindex:
+                key = entry[0]
+                if key == 'SEQNUM  ':
+                    step = int(binindex.get_entry(entry)[0])
+                    self._add_step(step)
+                    inlgr = False
+                elif key == 'LGR     ':
+                    inlgr = True
+                elif key == 'ENDLGR  ':
+                    inlgr = False
+                elif step is not None and not inlgr:
+                    self._entries[step].setdefault(key, (binindex, entry))
+
+        return None
+
+    def _add_step(self, step):
+        """Add report step
+        Raises:
+            ValueError if report step already found
+        """
+
+        if step in self._entries:
+            errstr = 'Report step ' + str(step) + ' found more than once'
+            raise ValueError(errstr)
+
+        self._steps.append(step)
+        self._entries[step] = dict()
+        return None
+
+    def _file_step(self, filename):
+        """Get report step from suffix of non-unified restart file, e.g. X0005 or F0005
+        Raises:
+            ValueError if no report step in file name
+        """
+
+        suffix = ''
+        if filename is not None:
+            suffix = get_file_name_parts(str(filename))[3]
+
+        match = re.match(r'^[XF]([0-9]{4})$', suffix.upper())
+        if match is None:
+            errstr = 'No SEQNUM keyword and no report step in file name ' + str(filename)
+            raise ValueError(errstr)
+
+        return int(match.group(1))
+
+    def _get_steps(self):
+        return list(self._steps)
+
+    steps = property(_get_steps, doc='Get list of report steps in file(s)')
+
+    def keywords(self, step):
+        """Get keywords stored for report step
+        Args:
+            step (int): Report step
+        Returns:
+            List of keywords, empty if report step not found
+        """
+
+        entries = self._entries.get(step)
+        if entries is None:
+            return []
+
+        return list(entries.keys())
+
+    def find(self, step, keyword):
+        """Find keyword index entry for report step
+        Args:
+            step (int): Report step
+            keyword (str): Eclipse keyword
+        Returns:
+            Tuple with keyword index (EclBinIndex) and index entry, or None if not found
+        """
+
+        entries = self._entries.get(step)
+        if entries is None:
+            return None
+
+        return entries.get(padblanc8(keyword))
+
+    def get(self, step, keyword):
+        """Get data for keyword at report step
+        Args:
+            step (int): Report step
+            keyword (str): Eclipse keyword, e.g. PRESSURE
+        Returns:
+            Numpy array, or None if keyword not found for report step
+        """
+
+        found = self.find(step, keyword)
+        if found is None:
+            return None
+
+        binindex, entry = found
+        return binindex.get_entry(entry)
+
+    def iter_steps(self, keyword, steps=None):
+        """Iterate over report steps with data for keyword
+        Args:
+            keyword (str): Eclipse keyword
+            steps: Optional collection of report steps.  All steps if None.
+        Yields:
+            Tuple with report step and Numpy array
+        """
+
+        if steps is None:
+            steps = self._steps
+
+        for step in steps:
+            found = self.find(step, keyword)
+            if found is not None:
+                binindex, entry = found
+                yield (step, binindex.get_entry(entry))
+
+    def get_cell_series(self, keyword, cells, steps=None, griddim=None, actnum=None):
+        """Get values for a set of cells at all report steps with data for keyword
+        Args:
+            keyword (str): Eclipse keyword, e.g. PRESSURE
+            cells: Positions in keyword array starting with 0 if griddim is None,
+                   else list of (i,j,k) starting with 1
+            steps: Optional collection of report steps.  All steps if None.
+            griddim (tuple): Optional grid dimensions (nx, ny, nz) for (i,j,k) input
+            actnum: Optional active cell flags for all grid cells, used with griddim
+        Returns:
+            Tuple with list of report steps and Numpy array (steps x cells) in native byte order
+        Raises:
+            ValueError if cell outside grid or inactive, keyword not found for any report step,
+            or number of values in keyword array not matching grid dimensions and active cells
+        Note:
+            Only the values for the requested cells are read from file.
+            Values are taken from the global grid arrays, LGR sections are skipped.
+        """
+
+        nexpect = None
+        if griddim is None:
+            positions = np.asarray(cells, dtype=np.int64)
+        else:
+            positions = self._cell_positions(cells, griddim, actnum)
+            nexpect = int(np.prod(griddim))
+            if actnum is not None:
+                nexpect = int(np.count_nonzero(actnum))
+
+        if steps is None:
+            steps = self._steps
+
+        found_steps = []
+        values = []
+        for step in steps:
+            found = self.find(step, keyword)
+            if found is not None:
+                binindex, entry = found
+                if nexpect is not None and entry[3] != nexpect:
+                    errstr = ('Incorrect number of values ' + str(entry[3]) + ' for keyword '
+                              + keyword + ' at report step ' + str(step))
+                    raise ValueError(errstr)
+                vals = binindex.get_entry_values(entry, positions)
+                if vals is not None:
+                    found_steps.append(step)
+                    values.append(vals)
+
+        if len(values) == 0:
+            errstr = 'Keyword ' + keyword + ' not found for report steps'
+            raise ValueError(errstr)
+
+        series = np.stack(values)
+        return (found_steps, series.astype(series.dtype.newbyteorder('='), copy=False))
+
+    def _cell_positions(self, cells, griddim, actnum=None):
+        """Convert (i,j,k) cells to positions in arrays for active cells
+        Args:
+            cells: List of (i,j,k), starting with 1
+            griddim (tuple): Grid dimensions (nx, ny, nz)
+            actnum: Optional active cell flags for all grid cells.  All cells active if None.
+        Returns:
+            Numpy array with positions, starting with 0
+        Raises:
+            ValueError if cell outside grid or inactive
+        """
+
+        nx, ny, nz = griddim
+        ijk = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        if ijk.size > 0:
+            if ijk.min() < 1 or np.any(ijk.max(axis=0) > np.array([nx, ny, nz])):
+                raise ValueError('Cell outside grid dimensions')
+
+        ib = cell_to_ib(ijk[:, 0], ijk[:, 1], ijk[:, 2], nx, ny, nz) - 1
+        if actnum is None:
+            return ib
+
+        active = np.asarray(actnum) != 0
+        if not np.all(active[ib]):
+            raise ValueError('Inactive cell found in cell list')
+
+        return np.cumsum(active)[ib] - 1
+
+    def close(self):
+        """Close memory maps
+        Raises:
+            ValueError if arrays returned as views are still in use
+        """
+
+        for binindex in self._indices:
+            binindex.close()
+
+        return None
@@ -0,0 +1,325 @@
+import io
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .keydatareader import KeyDataReader
+from .sidecarcache import SidecarCache
+
+class KeyDataCache(SidecarCache):
+    """Cache of tokenized include files for KeyDataReader, stored in a sidecar folder
+    Args:
+        cachedir (str): Folder for cache storage, created if missing
+        maxsize (int): Optional maximum cache size in bytes.  Default 512 MB.
+        validate (str): Check of cached files, mtime for size and modification time, hash for content hash
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Note:
+        Each cached file has a sub folder with the data lines as lists of items, repeated values
+        collapsed to (value, count), stored in JSON chunks of at most 65536 lines, and a JSON manifest.
+        Consecutive lines with numbers only, up to a slash, are also stored as numeric blocks in .npy
+        files for each chunk, and are read as one array by KeyDataReader.read_array, e.g. GRDECL data.
+        Chunks are loaded one at a time when the lines are replayed, and items are split for
+        each line replayed, not for lines read as numeric blocks.
+        Files with errors in tokenizing are recorded in the manifest without data lines, so they are
+        tokenized once, and are read from file with error messages.
+        Least recently used entries are removed when the cache exceeds maxsize.
+    """
+
+    _format = 3
+
+    def __init__(self, cachedir, maxsize=512*1024**2, validate='mtime', errfile=None):
+
+        super().__init__(cachedir, maxsize, validate, errfile)
+        self._chunklines = 65536
+
+    def _store(self, filename, tmpdir):
+        """Tokenize source file and store data lines in entry folder
+        Returns:
+            Dictionary with manifest items, with failed flag set if errors found in file
+        """
+
+        # Lines are stored flat: line numbers, item counts, items with character offset of each line,
+        # and (index, count) of repeated values
+        chunk = _ChunkWriter(tmpdir)
+        nchunk = 0
+        nbytes = 0
+        reader = KeyDataReader(filename, io.StringIO())
+        lines = reader.iter_terms()
+        try:
+            for lineno, terms in lines:
+                if chunk.nline >= self._chunklines:
+                    nbytes += chunk.write(nchunk)
+                    nchunk += 1
+                    chunk = _ChunkWriter(tmpdir)
+                chunk.add_line(lineno, terms)
+        finally:
+            lines.close()
+
+        if chunk.nline > 0:
+            nbytes += chunk.write(nchunk)
+            nchunk += 1
+
+        # Failed files are kept in cache, without data lines, to avoid tokenizing on each open
+        if not reader.isok:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            return {'nbytes': 0, 'nchunk': 0, 'failed': True}
+
+        return {'nbytes': nbytes, 'nchunk': nchunk, 'failed': False}
+
+    def get_lines(self, filename):
+        """Get cached data lines for include file, tokenizing the file if not in cache
+        Args:
+            filename (str): Include file name
+        Returns:
+            Iterator over tuples with line number and list of data items, with
+            repeated values as tuples (value, count), or None if file is not cached
+            or has errors
+        """
+
+        manifest = self.load(filename)
+        if manifest is None or manifest.get('failed'):
+            return None
+
+        return _KeyDataReplay(self._entry_dir(filename), manifest['nchunk'])
+
+
+class _ChunkWriter:
+    """Collection of data lines for one chunk in cache entry, with numeric blocks
+    Args:
+        tmpdir (str): Entry folder
+    """
+
+    def __init__(self, tmpdir):
+
+        self._tmpdir = tmpdir
+        self._linenos = []
+        self._counts = []
+        self._items = []
+        self._offsets = [0]
+        self._runs = []
+
+        # Numeric blocks: (first line, number of lines, kind, first value, number of values, slash)
+        self._blocks = []
+        self._values = {'i': [], 'f': []}
+        self._nvalues = {'i': 0, 'f': 0}
+        self._block = None
+
+    def _get_nline(self):
+        return len(self._linenos)
+
+    nline = property(_get_nline, doc='Get number of lines in chunk')
+
+    def add_line(self, lineno, terms):
+        """Add data line, and add line to numeric block if numbers only
+        Args:
+            lineno (int): Line number
+            terms (list): Data items, with repeated values as tuples (value, count)
+        """
+
+        numbers = None
+        slash = len(terms) > 0 and terms[-1] == '/'
+        if not any(type(item) is tuple for item in terms):
+            numbers = terms[0:-1] if slash else terms
+            try:
+                np.array(numbers, dtype=np.float64)
+            except (ValueError, OverflowError):
+                numbers = None
+
+        if numbers is None:
+            self._end_block()
+        else:
+            if self._block is None:
+                self._block = (len(self._linenos), [])
+            self._block[1].extend(numbers)
+
+        self._linenos.append(lineno)
+        self._counts.append(len(terms))
+        nchar = self._offsets[-1]
+        for item in terms:
+            if type(item) is tuple:
+                self._runs.extend((len(self._items), item[1]))
+                item = item[0]
+            self._items.append(item)
+            nchar += len(item) + 1
+        self._offsets.append(nchar)
+
+        if numbers is not None and slash:
+            self._end_block(slash=True)
+
+        return None
+
+    def _end_block(self, slash=False):
+        """Store current numeric block, as integers if all numbers are integers
+        """
+
+        if self._block is None:
+            return None
+
+        iline, numbers = self._block
+        nline = len(self._linenos) - iline
+        self._block = None
+        if len(numbers) == 0:
+            return None
+
+        # Integers are also used for float arrays, except for negative zero
+        kind = 'f'
+        try:
+            values = np.array(numbers, dtype=np.int64)
+            zeros = np.flatnonzero(values == 0)
+            if not any(numbers[i].startswith('-') for i in zeros):
+                kind = 'i'
+        except (ValueError, OverflowError):
+            pass
+        if kind == 'f':
+            values = np.array(numbers, dtype=np.float64)
+
+        self._blocks.append((iline, nline, kind, self._nvalues[kind], values.shape[0], slash))
+        self._values[kind].append(values)
+        self._nvalues[kind] += values.shape[0]
+
+        return None
+
+    def write(self, ichunk):
+        """Write chunk of data lines, items are joined by line breaks
+        Args:
+            ichunk (int): Chunk number
+        Returns:
+            Number of bytes written
+        """
+
+        self._end_block()
+
+        nbytes = 0
+        for kind, values in self._values.items():
+            if len(values) > 0:
+                npyname = os.path.join(self._tmpdir, str(ichunk) + '.' + kind + '.npy')
+                np.save(npyname, np.concatenate(values))
+                nbytes += os.path.getsize(npyname)
+
+        chunkname = os.path.join(self._tmpdir, str(ichunk) + '.json')
+        with open(chunkname, 'w') as fp:
+            json.dump({
+                'linenos': self._linenos,
+                'counts': self._counts,
+                'items': '\n'.join(self._items),
+                'offsets': self._offsets,
+                'runs': self._runs,
+                'blocks': self._blocks}, fp)
+
+        return nbytes + os.path.getsize(chunkname)
+
+
+class _KeyDataReplay:
+    """Iterator over cached data lines of include file, one chunk in memory at a time
+    Args:
+        entrydir (str): Cache entry folder
+        nchunk (int): Number of chunks
+    Note:
+        Numeric blocks can be taken as one array by next_block, instead of line by line.
+    """
+
+    def __init__(self, entrydir, nchunk):
+
+        self._entrydir = entrydir
+        self._nchunk = nchunk
+        self._ichunk = -1
+        self._iline = 0
+        self._linenos = []
+        self._starts = [0]
+        self._offsets = [0]
+        self._itemstr = ''
+        self._runs = []
+        self._irun = 0
+        self._blocks = dict()
+        self._values = dict()
+
+    def __iter__(self):
+        return self
+
+    def _load_chunk(self):
+        """Load next chunk, items are split for each line when the line is read
+        Returns:
+            False if no more chunks
+        """
+
+        if self._ichunk + 1 >= self._nchunk:
+            return False
+
+        self._ichunk += 1
+        base = os.path.join(self._entrydir, str(self._ichunk))
+        try:
+            with open(base + '.json', 'r') as fp:
+                chunk = json.load(fp)
+            self._values = dict()
+            for kind in ('i', 'f'):
+                if os.path.isfile(base + '.' + kind + '.npy'):
+                    self._values[kind] = np.load(base + '.' + kind + '.npy')
+        except (OSError, ValueError):
+            errstr = 'Cannot read cached data in ' + self._entrydir
+            raise IOError(errstr)
+
+        self._iline = 0
+        self._linenos = chunk['linenos']
+        self._starts = [0] + list(itertools.accumulate(chunk['counts']))
+        self._offsets = chunk['offsets']
+        self._itemstr = chunk['items']
+        self._runs = chunk['runs'] + [self._starts[-1]]
+        self._irun = 0
+        self._blocks = dict((block[0], block) for block in chunk['blocks'])
+
+        return True
+
+    def __next__(self):
+        """Get next data line
+        Returns:
+            Tuple with line number and list of data items, with repeated values as tuples (value, count)
+        """
+
+        while self._iline >= len(self._linenos):
+            if not self._load_chunk():
+                raise StopIteration
+
+        ibeg = self._starts[self._iline]
+        iend = self._starts[self._iline + 1]
+        terms = self._itemstr[self._offsets[self._iline]:self._offsets[self._iline + 1] - 1].split('\n')
+        while self._runs[self._irun] < ibeg:
+            self._irun += 2
+        while self._runs[self._irun] < iend:
+            terms[self._runs[self._irun] - ibeg] = (terms[self._runs[self._irun] - ibeg], self._runs[self._irun + 1])
+            self._irun += 2
+
+        lineno = self._linenos[self._iline]
+        self._iline += 1
+        return (lineno, terms)
+
+    def next_block(self, dtype):
+        """Get numeric block starting at next data line, if values can be read with data type
+        Args:
+            dtype: Numpy data type of values
+        Returns:
+            Tuple with line number of last line in block, Numpy array with values, and flag for
+            block ending with slash, or None if next line does not start a numeric block
+        """
+
+        while self._iline >= len(self._linenos):
+            if not self._load_chunk():
+                return None
+
+        block = self._blocks.get(self._iline)
+        if block is None:
+            return None
+
+        iline, nline, kind, start, nval, slash = block
+        values = self._values[kind][start:start + nval]
+        if dtype.kind in ('i', 'u'):
+            if kind != 'i':
+                return None
+            info = np.iinfo(dtype)
+            if values.min() < info.min or values.max() > info.max:
+                return None
+
+        self._iline = iline + nline
+        return (self._linenos[self._iline - 1], values, slash)
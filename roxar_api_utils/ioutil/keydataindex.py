@@ -0,0 +1,212 @@
+import mmap
+import os
+import re
+import sys
+
+class KeyDataIndex:
+    """Keyword index for keyword-based data file of ECLIPSE type, following INCLUDE files
+    Args:
+        infile (str): Data file name
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Note:
+        Files are scanned once with a regular expression on a memory map, data are not tokenized.
+        A keyword is recognized as a name of max 8 characters starting in the first column,
+        followed by blanks or end of line.  The rest of the line is ignored, as in Eclipse.
+        Lines with quotes or ending with slash are data records, not keywords.
+        Keywords are stored in upper case.
+        Include file names are resolved as in KeyDataReader, max two INCLUDE levels.
+        Scanning of a file stops at ENDINC.
+    """
+
+    def __init__(self, infile, errfile=None):
+
+        self._infile = infile
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+
+        self._keyword = re.compile(rb'^([A-Za-z][A-Za-z0-9_]{0,7})(?=[ \t\r\n]|$)([^\n]*)', re.M)
+        self._incname = re.compile(rb"(?:\s|--[^\n]*)*(?:'([^']*)'|([^\s'/]+))")
+        self._slash = re.compile(rb'(?:\s|--[^\n]*)*/')
+
+        # Index entries: (key, occurrence, file name, byte offset, line number, parents)
+        self._index = []
+        self._lookup = dict()
+        self._counts = dict()
+        self._scan(infile, ())
+
+    def __iter__(self):
+        for entry in self._index:
+            yield entry
+
+    def __len__(self):
+        return len(self._index)
+
+    def _scan(self, filename, parents):
+        """Scan keywords in file and store index entries, include files are scanned when found
+        Args:
+            filename (str): Data file name
+            parents (tuple): (file name, byte offset, line number) to continue reading
+                             in each including file, outermost first
+        Raises:
+            IOError if too many INCLUDE levels
+        """
+
+        try:
+            with open(filename, 'rb') as fp:
+                data = b''
+                if fp.seek(0, 2) > 0:
+                    data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            if len(parents) == 0:
+                print('\nFatal error:  Cannot open file ', filename, '\n', file=self._errfile)
+                raise OSError(e)
+            print('Error: Cannot open INCLUDE file', filename, '\n' + str(e), file=self._errfile)
+            return None
+
+        try:
+            lineno = 1
+            pos = 0
+            for match in self._keyword.finditer(data):
+                if match.start() < pos:
+                    continue
+
+                # Data record if quote or ending slash before comment
+                rest = match.group(2)
+                icomment = rest.find(b'--')
+                if icomment >= 0:
+                    rest = rest[0:icomment]
+                if b"'" in rest or rest.rstrip().endswith(b'/'):
+                    continue
+
+                lineno += self._count_lines(data, pos, match.start())
+                pos = match.start()
+                key = match.group(1).decode('ascii').upper()
+
+                occ = self._counts.get(key, 0)
+                self._counts[key] = occ + 1
+                self._lookup[(key, occ)] = len(self._index)
+                self._index.append((key, occ, filename, pos, lineno, parents))
+
+                if key == 'ENDINC':
+                    break
+                elif key == 'INCLUDE':
+                    pos = self._include(data, match.end(), filename, lineno, parents)
+                    lineno += self._count_lines(data, match.start(), pos)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+        return None
+
+    def _count_lines(self, data, start, end):
+        """Count line breaks in data between byte positions, in blocks
+        """
+
+        nline = 0
+        blocksize = 16*1024*1024
+        for ibeg in range(start, end, blocksize):
+            nline += data[ibeg:min(ibeg + blocksize, end)].count(b'\n')
+
+        return nline
+
+    def _include(self, data, pos, filename, lineno, parents):
+        """Read include file name following INCLUDE, and scan include file
+        Args:
+            data: Contents of including file
+            pos (int): Byte position after INCLUDE keyword
+            filename (str): Including file name
+            lineno (int): Line number of INCLUDE keyword
+            parents (tuple): Parents of including file
+        Returns:
+            Byte position of line following the include file name and slash
+        """
+
+        match = self._incname.match(data, pos)
+        if match is None:
+            print('Error: Missing file name following INCLUDE in', filename, file=self._errfile)
+            return pos
+
+        name = match.group(1)
+        if name is None:
+            name = match.group(2)
+        name = name.decode('ascii', 'replace').strip()
+
+        end = match.end()
+        slash = self._slash.match(data, end)
+        if slash is not None:
+            end = slash.end()
+        else:
+            print('Error: Missing slash following INCLUDE in', filename, file=self._errfile)
+
+        # Reading continues on the line following the slash
+        nextline = data.find(b'\n', end)
+        nextline = len(data) if nextline < 0 else nextline + 1
+
+        if len(parents) == 2:
+            raise IOError('Too many INCLUDE levels')
+
+        if not os.path.isabs(name):
+            folder = os.path.dirname(filename)
+            name = os.path.join(folder, name)
+
+        lastline = lineno + self._count_lines(data, pos, end)
+        self._scan(name, parents + ((filename, nextline, lastline),))
+
+        return nextline
+
+    def _get_keys(self):
+        keys = []
+        for entry in self._index:
+            if entry[1] == 0:
+                keys.append(entry[0])
+        return keys
+
+    keys = property(_get_keys, doc='Get list of unique keywords in file order')
+
+    def _get_files(self):
+        files = [self._infile]
+        for entry in self._index:
+            if entry[2] not in files:
+                files.append(entry[2])
+        return files
+
+    files = property(_get_files, doc='Get list of data file and include files with keywords')
+
+    def count(self, key):
+        """Get number of occurrences of keyword
+        Args:
+            key (str): Keyword
+        Returns:
+            Number of occurrences in data file and include files
+        """
+
+        return self._counts.get(key.upper(), 0)
+
+    def find(self, key, occurrence=0):
+        """Find index entry for keyword
+        Args:
+            key (str): Keyword
+            occurrence (int): Occurrence number of keyword, starting with 0
+        Returns:
+            Tuple with key, occurrence, file name, byte offset and line number of keyword line,
+            and parents, or None if not found
+        """
+
+        ind = self._lookup.get((key.upper(), occurrence))
+        if ind is None:
+            return None
+
+        return self._index[ind]
+
+    def select(self, keys):
+        """Get index entries for selected keywords
+        Args:
+            keys: Collection of keywords
+        Returns:
+            List of index entries in file order
+        """
+
+        keys = set([key.upper() for key in keys])
+        return [entry for entry in self._index if entry[0] in keys]
@@ -6,9 +6,14 @@ Updated June 14, 2016
 """
 
 import collections
+import re
 import sys
 import os
 
+import numpy as np
+
+from .keydataindex import KeyDataIndex
+
 # ========================================================================================
 # TEXT READER CLASS
 # ========================================================================================
@@ -19,10 +24,11 @@ class KeyDataReader:
     Args:
         filename: String with data file name
         errfile: File pointer for output of error messages
+        cache: Optional KeyDataCache for tokenized include files
 
     """
 
-    def __init__(self, infile, errfile=None):
+    def __init__(self, infile, errfile=None, cache=None):
 
 # Settings for error handling:
 
@@ -37,8 +43,9 @@ class KeyDataReader:
 # Settings for current input file:
         self._currentname = infile
         self._currentline = 0
+        self._bufsize = 1024*1024
         try:
-            self._currentfile = open(infile, 'r')
+            self._currentfile = open(infile, 'r', buffering=self._bufsize)
         except OSError as e:
             print('\nFatal error:  Cannot open file ', infile, '\n', file=self._errfile)
             raise OSError(e)
@@ -49,12 +56,24 @@ class KeyDataReader:
         self._files = [self._currentfile]
         self._linenos = [0]
 
+# Cached data lines replayed for each input file, None if read from file
+        self._cache = cache
+        self._replays = [None]
+
 # Settings for reading queue
         self._currentkey = ''
         self._qlength = 0
         self._que = collections.deque()
         self._slash = False
 
+# Keyword index, built on first keyword search
+        self._keyindex = None
+
+# Tokenizer for lines with quotes: comment, slash, quoted string (with repeat count),
+# unquoted item not containing comment start, or unterminated quote
+        self._token = re.compile(
+            r"(--)|(/)|((?:[0-9]+\*)?'[^']*')|((?:[^\s,'/-]|-(?!-))+)|(')")
+
     def _get_current_key(self):
         return self._currentkey
 
@@ -80,121 +99,195 @@ class KeyDataReader:
     isok = property(_get_isok, _set_isok, doc='Flag for reading ok')
 
 
-    def _ignore_hyp(self, tval):
-        """Replace text within hyphens with white space
+    def _nextline(self):
+        """
+        Returns next line from current file.
+
+        Returns:
+            list - data items in next line read
+
+        Note:
+            Strips comments. Strips text after slash.  Empty lines and comment lines are skipped.
 
         """
 
-        tout = tval
         while True:
-            ic = tout.find("\'")
+            line = self._currentfile.readline()
+            if not line:
+                return None
+
+            self._currentline += 1
+
+            terms = self._split_line(line)
+            if terms:
+                return terms
+
+
+    def _split_line(self, line):
+        """
+        Split line in terms based on blanks, commas and quotations, in a single pass
+
+        Args:
+            line: String with line read
+
+        Returns:
+            list - data items in line, slash as separate item
+
+        Note:
+            Text after comment start (--) or slash is ignored.
+            Quoted strings are returned with quotation marks.
+
+        """
+
+# Lines without quotes: split with string methods only
+        if "\'" not in line:
+            ic = line.find('--')
             if ic >= 0:
-                t2 = tout[ic+1:]
-                ic2 = t2.find("\'")
-                if ic2 >= 0:
-                    ic2 = ic2 + 2
-                    ic3 = ic + ic2
-                    sub = tout[ic:ic3]
-                    repl = ic2*' '
-                    tout = tout.replace(sub, repl)
-                else:
-                    break
+                line = line[0:ic]
+            isl = line.find('/')
+            if isl >= 0:
+                terms = line[0:isl].replace(',', ' ').split()
+                terms.append('/')
+                return terms
+            return line.replace(',', ' ').split()
+
+        terms = []
+        for comment, slash, quoted, item, badquote in self._token.findall(line):
+            if item:
+                terms.append(item)
+            elif quoted:
+                terms.append(quoted)
+            elif slash:
+                terms.append(slash)
+                break
+            elif comment:
+                break
             else:
+                self.writeerror('Missing quotation mark')
                 break
 
-        return tout
+        return terms
 
 
-    def _nextline(self):
+    def _nextterms(self):
         """
-        Returns next line from current file.
+        Read next line with data items, and collapse repeated values
 
         Returns:
-            tuple - data items in next line read
+            List of data items, with repeated values as tuples (value, count),
+            or None at end of file
 
         Note:
-            Strips comments. Strips text after slash. Strip blanks inside of quotation marks.
+            A single * is returned as is, N* is returned as ('*', N)
 
         """
 
-        read = True
-        while read:
-            line = self._currentfile.readline()
-            if not line:
+        replay = self._replays[self._incdepth]
+        if replay is not None:
+            line = next(replay, None)
+            if line is None:
                 return None
+            self._currentline, items = line
+            return items
 
-            self._currentline += 1
+        terms = self._nextline()
+        if terms is None or '*' not in ''.join(terms):
+            return terms
 
-# Remove comments
-            temp = line.strip()
-# Ignore text inside hyphens
-            temp2 = self._ignore_hyp(temp)
-            ic = temp2.find('--')
-            isl = temp2.find('/')
-            if temp == '':
-                read = True
-            elif ic == 0:
-                read = True
-            elif isl >= 0:
-                temp = temp[0:isl+1]
-                read = False
-            elif ic > 0:
-                ic -= 1
-                temp = temp[0:ic]
-                read = False
+        items = []
+        for it in terms:
+            if it.startswith("\'") and it.endswith("\'"):
+                iast = -1
             else:
-                read = False
+                iast = it.find('*')
 
-# Split line in terms
-
-        terms = []
-        while True:
-            t, temp = self._linsplit(temp)
-            if t is None:
-                break
+            if iast < 0 or it == '*':
+                items.append(it)
+            elif iast == 0:
+                self.writeerror('Incorrect use of repeated count')
             else:
-                terms.append(t)
+                try:
+                    itm = it[0:iast]
+                    rep = int(itm)
+                except ValueError:
+                    errstr = 'Incorrect format for repeated count: ' + itm + '*'
+                    self.writeerror(errstr)
+                    rep = 0
+                except IOError:
+                    self.writeerror('IO error')
+                    rep = 0
+
+                if iast == len(it)-1:
+                    itm = '*'
+                else:
+                    itm = it[iast+1:]
+
+                if rep == 1:
+                    items.append(itm)
+                elif rep > 1:
+                    items.append((itm, rep))
+
+        return items
 
-        return terms
 
-    def _linsplit(self, line):
+    def _nextblock(self, dtype):
         """
-        Return first term in line based on blanks,  commas, quotations
+        Read numeric block starting at next line, from cached data lines
+
+        Args:
+            dtype: Numpy data type of values
+
+        Returns:
+            Tuple with Numpy array of values and flag for slash read,
+            or None if not reading from cache or next line does not start a numeric block
 
         """
 
-        line = line.lstrip()
-        line = line.lstrip(',')
-        leng = len(line)
-        item = None
-        rest = ''
+        replay = self._replays[self._incdepth]
+        if replay is None:
+            return None
 
-        if leng == 0:
-            return (item, rest)
+        block = replay.next_block(dtype)
+        if block is None:
+            return None
 
-        il1 = line.find("\'")
+        self._currentline, values, slash = block
+        return (values, slash)
 
-        if il1 == 0:
-            linred = line[1:]
-            il2 = linred.find("\'")
-            if il2 >= 0:
-                item = line[0:il2+2]
-                if il2+2 < leng:
-                    rest = line[il2+3:]
 
-            else:
-                errstr = 'Missing quotation mark'
-                self.writeerror(errstr)
+    def _nextrun(self, nmax):
+        """
+        Return next data item from queue with number of repetitions, and maintain queue
 
-        else:
-            tmp = line.replace(',', ' ')
-            il2 = tmp.find(' ')
-            terms = tmp.split()
-            item = terms[0]
-            if il2 > 0:
-                rest = line[il2+1:]
+        Args:
+            nmax: Maximum number of repetitions consumed (int)
 
-        return (item, rest)
+        Returns:
+            Tuple with next data item as string and number of repetitions consumed.
+            Item is None at end of file.
+
+        """
+
+        while self._qlength == 0:
+            items = self._nextterms()
+            if items is None:
+                return (None, 0)
+
+            self._que.extend(items)
+            self._qlength = len(self._que)
+
+        item = self._que[0]
+        count = 1
+        if type(item) is tuple:
+            item, nrep = item
+            count = min(nrep, nmax)
+            if nrep > count:
+                self._que[0] = (item, nrep - count)
+                return (item, count)
+
+        self._que.popleft()
+        self._qlength -= 1
+        return (item, count)
 
 
     def _nextitem(self):
@@ -206,65 +299,30 @@ class KeyDataReader:
 
         """
 
-        if self._qlength == 0:
-            terms = self._nextline()
-            if terms is None:
-                return None
+        return self._nextrun(1)[0]
 
-            for it in terms:
-                if it.startswith("\'") and it.endswith("\'"):
-                    endslash = False
-                else:
-                    isl = it.find('/')
-                    if isl > 0:
-                        endslash = True
-                        it = it.strip('/')
-                    else:
-                        endslash = False
 
-                if it.startswith("\'") and it.endswith("\'"):
-                    iast = -1
-                else:
-                    iast = it.find('*')
-                    lit = len(it)
-
-                if iast >= 0:
-                    if it == '*':
-                        self._que.append(it)
-                    elif iast == 0:
-                        self.writeerror('Incorrect use of repeated count')
-                    else:
-                        try:
-                            itm = it[0:iast]
-                            rep = int(itm)
-                        except ValueError:
-                            errstr = 'Incorrect format for repeated count: ' + itm + '*'
-                            self.writeerror(errstr)
-                            rep = 0
-                        except IOError:
-                            self.writeerror('IO error')
-                            rep = 0
+    def _nextvalues(self, nmax):
+        """
+        Return repeated value at front of queue, if any
 
-                        if iast == lit-1:
-                            itm = '*'
-                        else:
-                            itm = it[iast+1:]
+        Args:
+            nmax: Maximum number of repetitions consumed (int)
 
-                        if rep > 0:
-                            for kitr in range(0, rep):
-                                self._que.append(itm)
+        Returns:
+            Tuple with value as string and number of repetitions consumed,
+            or None if next item is not a repeated value
 
-                else:
-                    self._que.append(it)
+        """
 
-                if endslash:
-                    self._que.append('/')
+        if self._slash or self._qlength == 0:
+            return None
 
-            self._qlength = len(self._que)
+        item = self._que[0]
+        if type(item) is not tuple or item[0] == '*':
+            return None
 
-        item = self._que.popleft()
-        self._qlength -= 1
-        return item
+        return self._nextrun(nmax)
 
 
     def _qflush(self):
@@ -314,7 +372,7 @@ class KeyDataReader:
                             name = os.path.join(folder, name)
 
                         try:
-                            self._currentfile = open(name, 'r')
+                            self._currentfile = open(name, 'r', buffering=self._bufsize)
                         except OSError as e:
                             errstr = 'Cannot open INCLUDE file ' + oname + '\n' + str(e)
                             self.writeerror(errstr)
@@ -328,6 +386,11 @@ class KeyDataReader:
                         self._files.append(self._currentfile)
                         self._linenos.append(0)
 
+                        replay = None
+                        if self._cache is not None and os.path.isfile(name):
+                            replay = self._cache.get_lines(name)
+                        self._replays.append(replay)
+
                     else:
                         print('Unexpected end-of-file following keyword INCLUDE',
                               file=self._errfile)
@@ -342,6 +405,7 @@ class KeyDataReader:
                         del self._filenames[inc]
                         del self._files[inc]
                         del self._linenos[inc]
+                        del self._replays[inc]
 
                         inc -= 1
                         self._incdepth = inc
@@ -364,6 +428,7 @@ class KeyDataReader:
                     del self._filenames[inc]
                     del self._files[inc]
                     del self._linenos[inc]
+                    del self._replays[inc]
 
                     inc -= 1
                     self._incdepth = inc
@@ -388,7 +453,9 @@ class KeyDataReader:
             return True
 
         while True:
-            itm = self._nextitem()
+            if self._qlength > 0 and '/' not in self._que:
+                self._qflush()
+            itm = self._nextrun(sys.maxsize)[0]
             if itm is None:
                 self.writeerror('Missing slash')
                 return False
@@ -459,10 +526,21 @@ class KeyDataReader:
 
         val = []
         try:
-            if nval > 0:
-                for it in range(0, nval):
-                    itm = self.readfloat()
-                    val.append(itm)
+            while len(val) < nval:
+                run = self._nextvalues(nval - len(val))
+                if run is None:
+                    val.append(self.readfloat())
+                    continue
+
+                # Repeated value is converted once and broadcast
+                item, count = run
+                try:
+                    itm = float(item)
+                except ValueError:
+                    errstr = 'Expected float, reading ' + str(item)
+                    self.writeerror(errstr)
+                    itm = 0.
+                val.extend([itm]*count)
         except ValueError as e:
             self.writeerror()
             raise ValueError(e)
@@ -531,10 +609,21 @@ class KeyDataReader:
 
         val = []
         try:
-            if nval > 0:
-                for it in range(0, nval):
-                    itm = self.readint()
-                    val.append(itm)
+            while len(val) < nval:
+                run = self._nextvalues(nval - len(val))
+                if run is None:
+                    val.append(self.readint())
+                    continue
+
+                # Repeated value is converted once and broadcast
+                item, count = run
+                try:
+                    itm = int(item)
+                except ValueError:
+                    errstr = 'Expected integer, reading ' + str(item)
+                    self.writeerror(errstr)
+                    itm = 0
+                val.extend([itm]*count)
         except ValueError as e:
             self.writeerror()
             raise ValueError(e)
@@ -542,6 +631,149 @@ class KeyDataReader:
         return val
 
 
+    def read_array(self, dtype=float, nval=None, default=None):
+        """
+        Read array of numeric values up to terminating slash into Numpy array
+
+        Args:
+            dtype: Numpy data type of values, e.g. float or numpy.int32
+            nval: Number of values expected (int).  All values up to slash if None.
+            default: Value for defaulted items (* or N*)
+
+        Returns:
+            Numpy array with values read
+
+        Note:
+            Data are converted one line at a time, and repeated values are filled
+            by slice assignment.  The slash is consumed, and is found by the next
+            call to readslash.
+
+        """
+
+        dtype = np.dtype(dtype)
+        if dtype.kind not in ('i', 'u', 'f'):
+            errstr = 'Unsupported data type for array: ' + str(dtype)
+            raise ValueError(errstr)
+
+        if nval is None:
+            val = np.empty(1024, dtype=dtype)
+        else:
+            val = np.empty(max(nval, 0), dtype=dtype)
+        nread = 0
+        toomany = False
+
+        # Items left in queue are read first, up to first slash
+        items = []
+        while self._qlength > 0 and not self._slash:
+            item = self._que.popleft()
+            self._qlength -= 1
+            if item == '/':
+                self._slash = True
+            else:
+                items.append(item)
+
+        while True:
+            for value, count in self._convert_items(items, dtype, default):
+                if nval is not None and nread + count > nval:
+                    toomany = True
+                    count = nval - nread
+                    if isinstance(value, np.ndarray) and value.ndim > 0:
+                        value = value[0:count]
+                elif nval is None and nread + count > val.shape[0]:
+                    grown = np.empty(max(2*val.shape[0], nread + count), dtype=dtype)
+                    grown[0:nread] = val[0:nread]
+                    val = grown
+
+                if count > 0:
+                    val[nread:nread+count] = value
+                    nread += count
+
+            if self._slash:
+                break
+
+            # Numeric lines replayed from cache are taken as one array
+            block = self._nextblock(dtype)
+            if block is not None:
+                items, self._slash = block
+                continue
+
+            items = self._nextterms()
+            if items is None:
+                self.writeerror('Missing slash')
+                break
+            elif len(items) > 0 and items[-1] == '/':
+                self._slash = True
+                items.pop()
+
+        if toomany:
+            self.writeerror('Too many values')
+
+        if nval is None:
+            return val[0:nread].copy()
+
+        if nread < nval:
+            if default is None:
+                self.writeerror('Missing value(s)')
+                default = 0
+            val[nread:] = default
+
+        return val
+
+
+    def _convert_items(self, items, dtype, default):
+        """
+        Convert data items to Numpy values
+
+        Args:
+            items: List of data items, with repeated values as tuples (value, count),
+                   or Numpy array of values
+            dtype: Numpy data type of values
+            default: Value for defaulted items, or None
+
+        Returns:
+            List of tuples (values, count), values as Numpy array or single value
+
+        """
+
+        if isinstance(items, np.ndarray):
+            return [(items, items.shape[0])]
+
+        if len(items) == 0:
+            return []
+
+        # Plain numbers are converted in one operation
+        try:
+            values = np.array(items, dtype=dtype)
+            if values.ndim == 1:
+                return [(values, values.shape[0])]
+        except (ValueError, TypeError, OverflowError):
+            pass
+
+        segments = []
+        for item in items:
+            count = 1
+            if type(item) is tuple:
+                item, count = item
+
+            if item == '*':
+                if default is None:
+                    self.writeerror('No default value defined')
+                    value = 0
+                else:
+                    value = default
+            else:
+                try:
+                    value = np.array(item, dtype=dtype)
+                except (ValueError, OverflowError):
+                    errstr = 'Expected number, reading ' + str(item)
+                    self.writeerror(errstr)
+                    value = 0
+
+            segments.append((value, count))
+
+        return segments
+
+
     def readstr(self, default=None):
         """
         Read string value from input stream
@@ -745,6 +977,130 @@ class KeyDataReader:
         return False
 
 
+    def seek_key(self, key, occurrence=0, index=None):
+        """
+        Position reader after keyword found in keyword index, as if returned by nextkey.
+
+        Args:
+            key: String with keyword, e.g., WELSPECS
+            occurrence: Occurrence number of keyword, starting with 0
+            index: Optional KeyDataIndex for data file.  Built on first search if None.
+
+        Returns:
+            Keyword as string, or None if not found
+
+        Note:
+            Data between current position and keyword are not read.  Include files
+            enclosing the keyword are opened, and reading continues in the including
+            files after the end of the include file.
+
+        """
+
+        if index is not None:
+            self._keyindex = index
+        elif self._keyindex is None:
+            self._keyindex = KeyDataIndex(self._filenames[0], self._errfile)
+
+        entry = self._keyindex.find(key, occurrence)
+        if entry is None:
+            return None
+
+        self._seek_entry(entry)
+        return self._currentkey
+
+
+    def iter_keys(self, keys, index=None):
+        """
+        Iterate over selected keywords, positioning reader after each keyword.
+
+        Args:
+            keys: Collection of keywords, e.g., ['COMPDAT', 'WCONHIST']
+            index: Optional KeyDataIndex for data file.  Built on first search if None.
+
+        Returns:
+            Iterator of keywords in file order
+
+        Note:
+            Data for each keyword can be read as after nextkey.  Other keywords are not read.
+
+        """
+
+        if index is not None:
+            self._keyindex = index
+        elif self._keyindex is None:
+            self._keyindex = KeyDataIndex(self._filenames[0], self._errfile)
+
+        for entry in self._keyindex.select(keys):
+            self._seek_entry(entry)
+            yield self._currentkey
+
+
+    def iter_terms(self):
+        """
+        Iterate over data lines in file, without keyword handling or include files.
+
+        Returns:
+            Iterator of tuples with line number and list of data items, with
+            repeated values as tuples (value, count)
+
+        Note:
+            Used for tokenizing include files, e.g., by KeyDataCache.  The file is closed at the end.
+            Errors in data lines are written as for nextkey, and isok is set to False.
+
+        """
+
+        try:
+            while True:
+                terms = self._nextterms()
+                if terms is None:
+                    break
+                if len(terms) > 0:
+                    yield (self._currentline, terms)
+        finally:
+            self._currentfile.close()
+
+
+    def _seek_entry(self, entry):
+        """
+        Reopen files for keyword index entry, and read keyword line
+
+        Args:
+            entry: Index entry, as returned by KeyDataIndex.find
+
+        """
+
+        key, occ, name, offset, lineno, parents = entry
+
+        for fp in self._files:
+            if not fp.closed:
+                fp.close()
+
+        self._filenames = []
+        self._files = []
+        self._linenos = []
+        for pname, poffset, plineno in parents + ((name, offset, 0),):
+            try:
+                fp = open(pname, 'r', buffering=self._bufsize)
+            except OSError as e:
+                errstr = 'Cannot open file ' + pname + '\n' + str(e)
+                raise IOError(errstr)
+            fp.seek(poffset)
+            self._filenames.append(pname)
+            self._files.append(fp)
+            self._linenos.append(plineno)
+
+        self._replays = [None]*len(self._files)
+        self._incdepth = len(parents)
+        self._currentname = name
+        self._currentfile = self._files[-1]
+        self._currentfile.readline()
+        self._currentline = lineno
+        self._currentkey = key
+        self._qflush()
+        self._slash = False
+        return None
+
+
     def writeerror(self, string=None):
         """
         Write error message with location info.
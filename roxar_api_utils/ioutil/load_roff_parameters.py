@@ -0,0 +1,206 @@
+import concurrent.futures
+import mmap
+import os
+import sys
+
+import numpy as np
+
+from .roffascreader import read_asc_values
+from .scan_roff_parameters import scan_roff_parameters
+
+def load_roff_parameters(files, names=None, workers=None, processes=False, shared=False, errfile=None):
+    """Load grid parameters from a list of ROFF files on a pool of threads or processes
+    Args:
+        files: List of binary or ASCII ROFF file names
+        names: Optional collection of parameter names to load.  All parameters if None.
+        workers (int): Optional number of workers.  Default as for concurrent.futures executors.
+        processes (bool): Use a process pool if True, else a thread pool
+        shared (bool): Let worker processes read data into shared memory instead of returning pickled data
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Returns:
+        Dictionary with Numpy array by parameter name
+    Raises:
+        ValueError if the same parameter name is found in more than one file
+    Note:
+        Only parameter data are read, other arrays in the files are skipped.
+        With shared memory, the files are first scanned for parameter sizes, then the data are
+        read by the workers into shared memory allocated by the calling process.
+        Shared memory requires Python 3.8 or later.
+    """
+
+    if errfile is None:
+        errfile = sys.stdout
+
+    if names is not None:
+        names = set(names)
+
+    shared = bool(shared and processes)
+    if shared and os.name == 'posix':
+        # Worker processes must use the resource tracker of this process
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+    if processes:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    params = dict()
+    with executor:
+        if not shared:
+            futures = [executor.submit(_load_file, fname, names) for fname in files]
+            for fname, future in zip(files, futures):
+                for name, val in future.result():
+                    _check_unique(params, name, fname)
+                    params[name] = val
+        else:
+            scans = list(executor.map(scan_roff_parameters, files, [names]*len(files)))
+            found = set()
+            for fname, (isascii, entries, actentry) in zip(files, scans):
+                for entry in entries:
+                    _check_unique(found, entry[0], fname)
+                    found.add(entry[0])
+            params = _load_shared(executor, files, scans)
+
+    return params
+
+def _check_unique(loaded, name, filename):
+    """Check that parameter name is not already loaded
+    Raises:
+        ValueError if name found
+    """
+
+    if name in loaded:
+        errstr = 'Parameter ' + name + ' found in more than one file, last in ' + filename
+        raise ValueError(errstr)
+
+    return None
+
+def _load_shared(executor, files, scans):
+    """Read parameters into shared memory on worker processes, and copy to Numpy arrays
+    Args:
+        executor: Process pool executor
+        files: List of ROFF file names
+        scans: List of (ASCII flag, parameter entries, active cell entry) for each file,
+               as returned by scan_roff_parameters
+    Returns:
+        Dictionary with Numpy array by parameter name
+    """
+
+    from multiprocessing import shared_memory
+
+    blocks = []
+    try:
+        futures = []
+        for fname, (isascii, entries, actentry) in zip(files, scans):
+            shmnames = []
+            for name, vtype, nval, offset, dtype in entries:
+                nbytes = nval*np.dtype(dtype).itemsize
+                shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+                blocks.append(shm)
+                shmnames.append(shm.name)
+            futures.append(executor.submit(_fill_file, fname, isascii, entries, shmnames))
+
+        for future in futures:
+            future.result()
+
+        params = dict()
+        iblock = 0
+        for isascii, entries, actentry in scans:
+            for name, vtype, nval, offset, dtype in entries:
+                shm = blocks[iblock]
+                iblock += 1
+                params[name] = np.ndarray(nval, dtype=_native(dtype), buffer=shm.buf).copy()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return params
+
+def _native(dtype):
+    """Get Numpy data type in native byte order, bool for ROFF bool data
+    """
+
+    return np.dtype(dtype).newbyteorder('=')
+
+def _read_into(filename, isascii, entry, out):
+    """Read parameter data from file into array
+    Args:
+        filename (str): ROFF file name
+        isascii (bool): ASCII ROFF file if True, else binary
+        entry (tuple): Parameter entry, as returned by scan_roff_parameters
+        out: Numpy array in native byte order for data
+    """
+
+    name, vtype, nval, offset, dtype = entry
+    if nval <= 0:
+        return None
+
+    with open(filename, 'rb') as fp:
+        if isascii:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                out[:] = read_asc_values(data, offset, nval, dtype)[0]
+            finally:
+                data.close()
+            return None
+
+        fp.seek(offset)
+        raw = out.view(np.uint8)
+        if fp.readinto(memoryview(raw)) < raw.shape[0]:
+            errstr = 'Unexpected end of file reading parameter ' + name
+            raise ValueError(errstr)
+
+    # Convert in place to bool values or native byte order
+    if vtype == 'bool':
+        np.minimum(raw, 1, out=raw)
+    elif not np.dtype(dtype).isnative:
+        out.byteswap(inplace=True)
+
+    return None
+
+def _load_file(filename, names):
+    """Load parameters from one ROFF file, run in worker thread or process
+    Args:
+        filename (str): ROFF file name
+        names: Set of parameter names to load, or None for all
+    Returns:
+        List of (name, Numpy array)
+    """
+
+    isascii, entries, actentry = scan_roff_parameters(filename, names)
+
+    loaded = []
+    for entry in entries:
+        val = np.empty(entry[2], dtype=_native(entry[4]))
+        _read_into(filename, isascii, entry, val)
+        loaded.append((entry[0], val))
+
+    return loaded
+
+def _fill_file(filename, isascii, entries, shmnames):
+    """Read parameters from one ROFF file into shared memory, run in worker process
+    Args:
+        filename (str): ROFF file name
+        isascii (bool): ASCII ROFF file if True, else binary
+        entries: List of parameter entries, as returned by scan_roff_parameters
+        shmnames: List of shared memory names, one for each entry
+    """
+
+    from multiprocessing import shared_memory
+
+    for entry, shmname in zip(entries, shmnames):
+        shm = shared_memory.SharedMemory(name=shmname)
+        try:
+            val = np.ndarray(entry[2], dtype=_native(entry[4]), buffer=shm.buf)
+            _read_into(filename, isascii, entry, val)
+            del val
+        finally:
+            try:
+                shm.close()
+            except BufferError:
+                # Array still referenced after error, closed when the process exits
+                pass
+
+    return None
@@ -0,0 +1,29 @@
+import sys
+
+from .roffascreader import RoffAscReader
+from .roffreader import RoffReader
+
+def open_roff_reader(infile, errfile=None, aslist=False):
+    """Open reader for binary or ASCII ROFF file, format found from the file header
+    Args:
+        infile (str): ROFF file name
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+        aslist (bool): Optional flag, arrays returned as lists if True.  Default Numpy arrays.
+    Returns:
+        RoffAscReader for ASCII file, else RoffReader
+    """
+
+    if errfile is None:
+        errfile = sys.stdout
+
+    try:
+        with open(infile, 'rb') as fp:
+            isascii = fp.read(8) == b'roff-asc'
+    except OSError as e:
+        print('\nFatal error: Cannot open file ', infile, '\n', file=errfile)
+        raise OSError(e)
+
+    if isascii:
+        return RoffAscReader(infile, errfile, aslist)
+
+    return RoffReader(infile, errfile, aslist)
@@ -0,0 +1,215 @@
+import mmap
+import sys
+
+import numpy as np
+
+from .roffascreader import read_asc_values
+from .scan_roff_parameters import scan_roff_parameters
+
+def roff_parameter_stats(
+        infile, names=None, bins=None, hist_range=None, active=None,
+        undefined='default', chunksize=1024*1024, errfile=None):
+    """Get statistics for grid parameters in ROFF file, reading data in chunks
+    Args:
+        infile (str): Binary or ASCII ROFF grid or parameter file
+        names: Optional collection of parameter names.  All parameters if None.
+        bins (int): Optional number of histogram bins.  No histogram if None.
+        hist_range (tuple): Optional (min, max) for histogram.  Parameter min and max if None.
+        active: Optional active cell filter.  True for active tag in infile, file name of ROFF grid file
+                with active tag, or array with active cell flags in ROFF cell order.  All cells if None.
+        undefined: Optional value for undefined cells.  Default -999 for int, float and double, and 255 for byte.
+                   No undefined value if None.  NaN values are always counted as undefined.
+        chunksize (int): Number of values read from file in each chunk
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Returns:
+        Dictionary with statistics by parameter name.  Statistics are given as dictionary with
+        nval, count, undefined, inactive, min, max, mean, std, and hist and edges if bins is given.
+    Raises:
+        ValueError if active cells not found, or incorrect number of active cell flags
+    Note:
+        Parameter data are never read in full.  A second pass through the data is done
+        for histograms without hist_range.
+    """
+
+    if errfile is None:
+        errfile = sys.stdout
+
+    isascii, entries, actentry = scan_roff_parameters(infile, names, errfile)
+
+    actsource = None
+    if active is True:
+        if actentry is None:
+            errstr = 'Active cells not found in file ' + infile
+            raise ValueError(errstr)
+        actsource = (infile, isascii, actentry)
+    elif isinstance(active, str):
+        actascii, actentries, actentry = scan_roff_parameters(active, [], errfile)
+        if actentry is None:
+            errstr = 'Active cells not found in file ' + active
+            raise ValueError(errstr)
+        actsource = (active, actascii, actentry)
+    elif active is not None:
+        actsource = np.asarray(active) != 0
+
+    stats = dict()
+    for name, vtype, nval, offset, dtype in entries:
+        undef = undefined
+        if isinstance(undefined, str) and undefined == 'default':
+            undef = {'int': -999, 'float': -999.0, 'double': -999.0, 'byte': 255}.get(vtype)
+
+        source = (infile, isascii, (name, vtype, nval, offset, dtype))
+        pstat = _accumulate(source, actsource, undef, chunksize, bins, hist_range)
+        if bins is not None and hist_range is None:
+            prange = (0.0, 1.0)
+            if pstat['count'] > 0:
+                prange = (pstat['min'], pstat['max'])
+            hist = _accumulate(source, actsource, undef, chunksize, bins, prange)
+            pstat['hist'] = hist['hist']
+            pstat['edges'] = hist['edges']
+        stats[name] = pstat
+
+    return stats
+
+def _iter_chunks(filename, isascii, entry, chunksize):
+    """Iterate over array data in file in chunks
+    Args:
+        filename (str): ROFF file name
+        isascii (bool): ASCII ROFF file if True, else binary
+        entry (tuple): Array entry, as returned by scan_roff_parameters
+        chunksize (int): Number of values in each chunk
+    Yields:
+        Numpy array in native byte order
+    """
+
+    name, vtype, nval, offset, dtype = entry
+    with open(filename, 'rb') as fp:
+        if isascii:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                pos = offset
+                for ibeg in range(0, nval, chunksize):
+                    nread = min(chunksize, nval - ibeg)
+                    val, pos = read_asc_values(data, pos, nread, dtype)
+                    yield val
+                    del val
+            finally:
+                data.close()
+            return
+
+        if vtype == 'bool':
+            dtype = np.dtype(np.uint8)
+
+        fp.seek(offset)
+        for ibeg in range(0, nval, chunksize):
+            nread = min(chunksize, nval - ibeg)
+            val = np.fromfile(fp, dtype=dtype, count=nread)
+            if val.shape[0] < nread:
+                errstr = 'Unexpected end of file reading array ' + name
+                raise ValueError(errstr)
+            if vtype == 'bool':
+                val = val != 0
+            yield val.astype(val.dtype.newbyteorder('='), copy=False)
+
+def _accumulate(source, actsource, undefined, chunksize, bins, hist_range):
+    """Accumulate statistics over array chunks
+    Args:
+        source (tuple): File name, ASCII flag and parameter entry
+        actsource: Tuple with file name, ASCII flag and active cell entry, array with flags, or None
+        undefined: Value for undefined cells, or None
+        chunksize (int): Number of values in each chunk
+        bins (int): Number of histogram bins, or None
+        hist_range (tuple): (min, max) for histogram, or None for no histogram
+    Returns:
+        Dictionary with statistics
+    """
+
+    filename, isascii, entry = source
+    nval = entry[2]
+
+    actchunks = None
+    if isinstance(actsource, tuple):
+        if actsource[2][2] != nval:
+            errstr = 'Incorrect number of active cell flags for ' + entry[0]
+            raise ValueError(errstr)
+        actchunks = _iter_chunks(actsource[0], actsource[1], actsource[2], chunksize)
+    elif actsource is not None and actsource.shape[0] != nval:
+        errstr = 'Incorrect number of active cell flags for ' + entry[0]
+        raise ValueError(errstr)
+
+    count = 0
+    nundef = 0
+    ninact = 0
+    vmin = None
+    vmax = None
+    mean = 0.0
+    m2 = 0.0
+    hist = None
+    if bins is not None and hist_range is not None:
+        hist = np.zeros(bins, dtype=np.int64)
+
+    ibeg = 0
+    for val in _iter_chunks(filename, isascii, entry, chunksize):
+        nchunk = val.shape[0]
+        if actchunks is not None:
+            mask = next(actchunks)
+        elif actsource is not None:
+            mask = actsource[ibeg:ibeg + nchunk]
+        else:
+            mask = np.ones(nchunk, dtype=bool)
+        ibeg += nchunk
+        ninact += nchunk - int(np.count_nonzero(mask))
+
+        undef = np.zeros(nchunk, dtype=bool)
+        if undefined is not None:
+            undef = val == undefined
+        if val.dtype.kind == 'f':
+            undef |= np.isnan(val)
+        undef &= mask
+        nundef += int(np.count_nonzero(undef))
+
+        sel = val[mask & ~undef]
+        if sel.shape[0] == 0:
+            continue
+
+        if sel.dtype == np.bool_:
+            sel = sel.astype(np.uint8)
+        cmin = sel.min().item()
+        cmax = sel.max().item()
+        vmin = cmin if vmin is None else min(vmin, cmin)
+        vmax = cmax if vmax is None else max(vmax, cmax)
+
+        # Combine mean and sum of squared deviations with previous chunks
+        fsel = sel.astype(np.float64)
+        ncur = fsel.shape[0]
+        cmean = fsel.mean()
+        dev = fsel - cmean
+        delta = cmean - mean
+        ntot = count + ncur
+        mean += delta*ncur/ntot
+        m2 += np.dot(dev, dev) + delta*delta*count*ncur/ntot
+        count = ntot
+
+        if hist is not None:
+            hist += np.histogram(fsel, bins=bins, range=hist_range)[0]
+
+    std = None
+    if count > 0:
+        std = float((m2/count)**0.5)
+    else:
+        mean = None
+
+    pstat = {
+        'nval': nval,
+        'count': count,
+        'undefined': nundef,
+        'inactive': ninact,
+        'min': vmin,
+        'max': vmax,
+        'mean': float(mean) if mean is not None else None,
+        'std': std}
+
+    if hist is not None:
+        pstat['hist'] = hist
+        pstat['edges'] = np.histogram_bin_edges(np.empty(0), bins=bins, range=hist_range)
+
+    return pstat
@@ -0,0 +1,182 @@
+import sys
+
+import numpy as np
+
+from .eclbinwriter import EclBinWriter
+from .open_roff_reader import open_roff_reader
+from .roffreader import RoffLazyArray
+
+def roff_to_eclipse(
+        infile, outfile, fileformat='grdecl', select=None, keywords=None,
+        actnum=False, active_only=False, errfile=None):
+    """Convert grid parameters in ROFF file to Eclipse keywords, one parameter at a time
+    Args:
+        infile (str): Binary or ASCII ROFF grid or parameter file
+        outfile (str): Output file name
+        fileformat (str): Output format, grdecl for GRDECL text or binary for Eclipse binary
+        select: Optional collection of parameter names to convert.  All parameters if None.
+        keywords (dict): Optional Eclipse keyword by parameter name.  Default upper case name, max 8 characters.
+        actnum (bool): Write active cell flags from the ROFF active tag as ACTNUM if True
+        active_only (bool): Write values for active cells only, as in INIT files.  Only for binary format.
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Returns:
+        List of Eclipse keywords written
+    Raises:
+        ValueError if grid dimensions or active cells are missing, or incorrect number of values
+    Note:
+        Values are reordered from ROFF order (k reversed, k fastest) to Eclipse order (i fastest),
+        with a single transposed copy of each parameter.
+        Parameter data are read when reached and released after writing.
+    """
+
+    if errfile is None:
+        errfile = sys.stdout
+
+    if fileformat not in ('grdecl', 'binary'):
+        errstr = 'Unknown output format ' + str(fileformat)
+        raise ValueError(errstr)
+
+    if active_only and fileformat != 'binary':
+        raise ValueError('Active cells only supported for binary format')
+
+    if keywords is None:
+        keywords = dict()
+
+    reader = open_roff_reader(infile, errfile)
+
+    mode = 'w'
+    if fileformat == 'binary':
+        mode = 'wb'
+
+    try:
+        outfp = open(outfile, mode)
+    except OSError as e:
+        reader.close()
+        print('\nFatal error: Cannot open file ', outfile, '\n', file=errfile)
+        raise OSError(e)
+
+    writer = None
+    if fileformat == 'binary':
+        writer = EclBinWriter(outfp, errfile)
+    else:
+        print('-- Converted from ROFF file', infile, file=outfp)
+
+    written = []
+    dims = [0, 0, 0]
+    active = None
+    tagname = None
+    name = None
+    try:
+        while True:
+            key, vtype, nval, val = reader.next_key(lazy=True)
+            if key is None:
+                break
+
+            if vtype == 'tag':
+                tagname = key
+                name = None
+            elif vtype == 'endtag':
+                tagname = None
+            elif tagname == 'dimensions' and key in ('nX', 'nY', 'nZ'):
+                dims[('nX', 'nY', 'nZ').index(key)] = val
+            elif tagname == 'active' and key == 'data':
+                active = _to_eclipse_order(np.asarray(val), dims, key) != 0
+                if actnum:
+                    _write_keyword(outfp, writer, 'ACTNUM', active.astype(np.int32), 'int', None)
+                    written.append('ACTNUM')
+            elif tagname == 'parameter' and key == 'name':
+                name = val
+            elif tagname == 'parameter' and key == 'data' and name is not None:
+                if select is not None and name not in select:
+                    continue
+
+                keyword = keywords.get(name)
+                if keyword is None:
+                    keyword = name.upper()[0:8]
+                    if len(name) > 8:
+                        print('Warning: Parameter', name, 'written as keyword', keyword, file=errfile)
+
+                if active_only and active is None:
+                    errstr = 'Active cells not found before parameter ' + name
+                    raise ValueError(errstr)
+
+                data = _to_eclipse_order(np.asarray(val), dims, name)
+                if isinstance(val, RoffLazyArray):
+                    val.release()
+                mask = active if active_only else None
+                _write_keyword(outfp, writer, keyword, data, vtype, mask)
+                written.append(keyword)
+                del data
+    finally:
+        reader.close()
+        outfp.close()
+
+    return written
+
+def _to_eclipse_order(data, dims, name):
+    """Reorder array from ROFF to Eclipse cell order
+    Args:
+        data: Numpy array in ROFF order, i slowest and k fastest, bottom layer first
+        dims: Grid dimensions (nx, ny, nz)
+        name (str): Parameter name, used in error messages
+    Returns:
+        Numpy array in Eclipse order, i fastest and top layer first
+    """
+
+    nx, ny, nz = dims
+    if min(dims) <= 0:
+        raise ValueError('Grid dimensions not found before ' + name)
+
+    if data.shape[0] != nx*ny*nz:
+        errstr = 'Incorrect number of values ' + str(data.shape[0]) + ' for ' + name
+        raise ValueError(errstr)
+
+    return data.reshape(nx, ny, nz)[:, :, ::-1].transpose(2, 1, 0).ravel()
+
+def _write_keyword(outfp, writer, keyword, data, vtype, mask):
+    """Write keyword data as Eclipse binary or GRDECL text
+    Args:
+        outfp: Output file pointer
+        writer: EclBinWriter for binary output, None for text output
+        keyword (str): Eclipse keyword
+        data: Numpy array in Eclipse cell order
+        vtype (str): ROFF data type
+        mask: Optional Numpy array with flags for cells to be written
+    """
+
+    if mask is not None:
+        data = data[mask]
+
+    if vtype == 'float':
+        ktype = 'REAL'
+        vform = '%.7g'
+    elif vtype == 'double':
+        ktype = 'DOUB'
+        vform = '%.15g'
+    else:
+        ktype = 'INTE'
+        vform = '%d'
+        data = data.astype(np.int32, copy=False)
+
+    nval = data.shape[0]
+    if writer is not None:
+        writer.write_key(keyword, nval, ktype)
+        writer.write_data(keyword, data, nval, ktype)
+        return None
+
+    outfp.write('\n' + keyword + '\n')
+
+    nrow = 8
+    nchunk = 1000*nrow
+    rowform = ' '.join([vform]*nrow) + '\n'
+    nfull = (nval // nrow)*nrow
+    for ibeg in range(0, nfull, nchunk):
+        iend = min(ibeg + nchunk, nfull)
+        outfp.write(rowform*((iend - ibeg) // nrow) % tuple(data[ibeg:iend].tolist()))
+
+    if nfull < nval:
+        outfp.write(' '.join([vform]*(nval - nfull)) % tuple(data[nfull:].tolist()) + '\n')
+
+    outfp.write('/\n')
+
+    return None
@@ -0,0 +1,465 @@
+import mmap
+import re
+import sys
+import warnings
+
+import numpy as np
+
+from .roffreader import RoffLazyArray
+
+# Whitespace flags by byte value, as for bytes.split
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[[9, 10, 11, 12, 13, 32]] = True
+
+def _skip_values(data, pos, nval, blocksize):
+    """Find byte position after a number of values separated by whitespace
+    Args:
+        data: ROFF file contents as bytes or memory map
+        pos (int): Byte position of first value, or whitespace before it
+        nval (int): Number of values
+        blocksize (int): Maximum number of bytes scanned in each block
+    Returns:
+        Byte position after last value
+    Raises:
+        ValueError if end of file found
+    Note:
+        Value starts are counted with Numpy on views of the data, in blocks ending with whitespace.
+        Block size follows the number of values still needed, so small arrays scan a few bytes.
+    """
+
+    end = len(data)
+    need = nval
+    nbytes = 0
+    while need > 0:
+        if pos >= end:
+            errstr = 'Unexpected end of file reading array of ' + str(nval) + ' values'
+            raise ValueError(errstr)
+
+        nbytes = max(nbytes, min(blocksize, 32*need + 64))
+        stop = min(pos + nbytes, end)
+        view = np.frombuffer(data, dtype=np.uint8, count=stop - pos, offset=pos)
+        space = _SPACE[view]
+        del view
+
+        if stop < end and not space[-1]:
+            # Do not split a value between blocks
+            nspace = np.flatnonzero(space)
+            if nspace.shape[0] == 0:
+                nbytes *= 2
+                continue
+            stop = pos + int(nspace[-1]) + 1
+            space = space[0:stop - pos]
+
+        starts = ~space
+        starts[1:] &= space[0:-1]
+        nstart = int(np.count_nonzero(starts))
+        if nstart < need:
+            need -= nstart
+            pos = stop
+            continue
+
+        # End of last value is the first whitespace after its start
+        ilast = int(np.flatnonzero(starts)[need - 1])
+        after = np.flatnonzero(space[ilast:])
+        if after.shape[0] == 0:
+            return stop
+        return pos + ilast + int(after[0])
+
+    return pos
+
+def read_asc_values(data, pos, nval, dtype, convert=True, blocksize=1024*1024):
+    """Read array of numeric values from ASCII ROFF data
+    Args:
+        data: ROFF file contents as bytes or memory map
+        pos (int): Byte position of first value
+        nval (int): Number of values expected
+        dtype: Numpy data type for values, bool for 0/1 values
+        convert (bool): Convert values if True, else values are skipped
+        blocksize (int): Number of bytes converted in each block
+    Returns:
+        Tuple with Numpy array (None if not converted) and byte position after last value
+    Raises:
+        ValueError if end of file or incorrect value found
+    Note:
+        Values are counted and skipped without copying the data, see _skip_values.
+        Data are copied and converted one block at a time only if values are returned.
+    """
+
+    end = _skip_values(data, pos, nval, blocksize)
+    if not convert:
+        return (None, end)
+
+    dtype = np.dtype(dtype)
+    ctype = dtype
+    if dtype == np.bool_:
+        ctype = np.dtype(np.int32)
+
+    whitespace = (b' ', b'\n', b'\t', b'\r')
+    values = []
+    nread = 0
+    while pos < end:
+        stop = min(pos + blocksize, end)
+        if stop < end:
+            # Do not split a value between blocks
+            stop = max(data.rfind(char, pos, stop) for char in whitespace)
+            if stop <= pos:
+                blocksize *= 2
+                continue
+
+        block = data[pos:stop]
+        pos = stop
+        if block.isspace():
+            continue
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                val = np.fromstring(block, dtype=ctype, sep=' ')
+        except ValueError:
+            val = None
+        if val is None:
+            errstr = 'Incorrect value in array of ' + str(nval) + ' values'
+            raise ValueError(errstr)
+        values.append(val)
+        nread += val.shape[0]
+
+    if nread != max(nval, 0):
+        errstr = 'Incorrect value in array of ' + str(nval) + ' values'
+        raise ValueError(errstr)
+
+    if len(values) == 0:
+        val = np.empty(0, dtype=ctype)
+    elif len(values) == 1:
+        val = values[0]
+    else:
+        val = np.concatenate(values)
+
+    if dtype == np.bool_:
+        val = val != 0
+
+    return (val, end)
+
+# =========================================================================================
+# ROFF ASCII LAZY ARRAY CLASS
+# =========================================================================================
+
+class RoffAscLazyArray(RoffLazyArray):
+    """Proxy for array data in ASCII ROFF file, data are parsed when accessed
+    Args:
+        filename: ROFF file name as string
+        vtype: Data type as returned by RoffAscReader.next_key
+        nval: Number of values
+        dtype: Numpy data type of values
+        offset: Byte offset of first value in file
+        aslist: Optional flag, data returned as list if True.  Default Numpy array.
+    """
+
+    def __repr__(self):
+        return (
+            'RoffAscLazyArray(' + self._vtype + ', ' + str(self._nval)
+            + ' values at offset ' + str(self._offset) + ')')
+
+    def _read_array(self):
+        """Parse data from file, data are kept after first read
+        Returns:
+            Numpy array
+        """
+
+        if self._data is None:
+            with open(self._filename, 'rb') as fp:
+                data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    self._data = read_asc_values(data, self._offset, self._nval, self._dtype)[0]
+                finally:
+                    data.close()
+
+        return self._data
+
+# =========================================================================================
+# ROFF ASCII READER CLASS
+# =========================================================================================
+
+class RoffAscReader:
+    """Reader for ASCII ROFF file, with the same interface as RoffReader
+    Args:
+        filename: ROFF file name as string
+        errfile: File pointer to file for error messages
+        aslist: Optional flag, arrays returned as lists if True.  Default Numpy arrays.
+    Note:
+        The file is memory mapped and tokenized with a compiled regular expression.
+        Numeric arrays are converted in blocks with Numpy.
+        The byteswaptest value is returned as the native byte order, as by RoffReader.
+    """
+
+    def __init__(self, infile, errfile=None, aslist=False):
+
+        # Settings for error handling:
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+        self._ok = True
+        self._aslist = aslist
+
+        # Settings for current input file:
+        self._roffname = infile
+        self._decode = 'ascii'
+        self._token = re.compile(rb'\s*(?:"([^"]*)"|(#[^#]*#)|(\S+))')
+        try:
+            self._roff = open(infile, 'rb')
+            self._data = b''
+            if self._roff.seek(0, 2) > 0:
+                self._data = mmap.mmap(self._roff.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            print('\nFatal error: Cannot open file ', infile, '\n', file=self._errfile)
+            raise OSError(e)
+
+        # Check ASCII
+        if self._data[0:8] != b'roff-asc':
+            self.close()
+            errstr = '\nFatal error: Not an ASCII ROFF file ' + infile + '\n'
+            raise ValueError(errstr)
+
+        self._pos = 8
+
+        # Numpy data types for arrays
+        self._dtypes = {
+            'int': np.dtype(np.int32),
+            'float': np.dtype(np.float32),
+            'double': np.dtype(np.float64),
+            'bool': np.dtype(np.bool_),
+            'byte': np.dtype(np.uint8)}
+
+    def next_key(self, lazy=False):
+        """Read next keyword in ASCII ROFF file
+        Args:
+            lazy - bool - Return numeric arrays as RoffAscLazyArray, data are skipped and parsed when accessed
+        Returns:
+            keyword, data type, number of values, and values
+        """
+
+        alltypes = ('int', 'float', 'double', 'bool', 'byte', 'char')
+        key = None
+        vtype = None
+        nval = 0
+        val = None
+
+        string = self._readc()
+        if   string is None:
+            pass
+        elif string == 'tag':
+            tagname = self._readc()
+            if tagname != 'eof':
+                key = tagname
+                vtype = 'tag'
+        elif string == 'endtag':
+            key = string
+            vtype = 'endtag'
+
+        elif string in alltypes:
+            key, vtype, val = self._readval(string)
+            nval = 1
+        elif string == 'array':
+            key, vtype, nval, val, offset = self._readarray(lazy=lazy)
+        else:
+            errstr = 'Unexpected tag/key: ' + string
+            raise ValueError(errstr)
+
+        return (key, vtype, nval, val)
+
+    def close(self):
+        """Close memory map and ROFF file
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._roff.close()
+        return None
+
+    def iter_headers(self):
+        """Iterate over keys in ASCII ROFF file, skipping array data without converting it
+        Yields:
+            Tuple with tag name, key, data type, number of values, value, and byte offset of array data
+        Note:
+            Start of tag is returned with key None and data type tag.
+            Array values are returned as None, except for char arrays.
+            Data type is as stored in file, byte arrays are returned as type byte.
+            Byte offset is None for single values.
+        """
+
+        alltypes = ('int', 'float', 'double', 'bool', 'byte', 'char')
+        tagname = None
+        while True:
+            string = self._readc()
+            if string is None:
+                return
+            elif string == 'tag':
+                tagname = self._readc()
+                if tagname == 'eof':
+                    return
+                yield (tagname, None, 'tag', 0, None, None)
+            elif string == 'endtag':
+                tagname = None
+            elif string in alltypes:
+                key, vtype, val = self._readval(string)
+                yield (tagname, key, vtype, 1, val, None)
+            elif string == 'array':
+                key, vtype, nval, val, offset = self._readarray(skip=True)
+                yield (tagname, key, vtype, nval, val, offset)
+            else:
+                errstr = 'Unexpected tag/key: ' + string
+                raise ValueError(errstr)
+
+    def data_type(self, vtype):
+        """Get Numpy data type for ROFF data type
+        Args:
+            vtype - string - Roff data type (int, float, double, bool, byte)
+        Returns:
+            Numpy data type
+        Raises:
+            ValueError if unknown or variable length data type
+        """
+
+        dtype = self._dtypes.get(vtype)
+        if dtype is None:
+            errstr = 'Unknown data type : ' + vtype
+            raise ValueError(errstr)
+
+        return dtype
+
+    def _readval(self, vtype):
+        """Read single value of arbitrary type
+        Args:
+            type    - string - Roff data type
+        """
+
+        key = self._readc()
+        string = self._readc()
+        if string is None:
+            errstr = 'Unexpected end of file reading value for ' + str(key)
+            raise ValueError(errstr)
+
+        if key == 'byteswaptest':
+            return (key, 'str', self._byteswaptest(string))
+
+        try:
+            if vtype in ('int', 'bool', 'byte'):
+                val = int(string)
+                if vtype == 'bool':
+                    val = val != 0
+                elif vtype == 'byte':
+                    val = bytes([val])
+            elif vtype in ('float', 'double'):
+                val = float(string)
+            elif vtype == 'char':
+                val = string
+                vtype = 'str'
+            else:
+                errstr = 'Unknown data type : ' + vtype
+                raise ValueError(errstr)
+        except ValueError:
+            errstr = 'Incorrect value for ' + str(key) + ': ' + string
+            raise ValueError(errstr)
+
+        return (key, vtype, val)
+
+    def _byteswaptest(self, string):
+        """Check byteswaptest value, returned as by RoffReader
+        Args:
+            string - string - Value read
+        Returns:
+            Byte order of data, native for ASCII data
+        """
+
+        if string != '1':
+            errstr = 'Byte-swap test failed ' + string
+            raise ValueError(errstr)
+
+        if sys.byteorder == 'little':
+            return 'Little endian'
+        return 'Big endiand'
+
+    def _readarray(self, skip=False, lazy=False):
+        """Read array of arbitrary type
+        Args:
+            skip - bool - Skip data without converting, except for char arrays
+            lazy - bool - Skip data and return RoffAscLazyArray, except for char arrays
+        Returns:
+            key, data type, number of values, values, and byte offset of array data
+        """
+
+        vtype = self._readc()
+        key = self._readc()
+        try:
+            nval = int(self._readc())
+        except (TypeError, ValueError):
+            errstr = 'Incorrect number of values for array ' + str(key)
+            raise ValueError(errstr)
+        val = None
+        offset = self._pos
+
+        if nval <= 0:
+            return (key, vtype, nval, val, offset)
+
+        if vtype == 'char':
+            val = self._readac(nval)
+            vtype = 'str'
+            return (key, vtype, nval, val, offset)
+
+        dtype = self.data_type(vtype)
+        if skip:
+            self._pos = read_asc_values(self._data, self._pos, nval, dtype, convert=False)[1]
+            return (key, vtype, nval, val, offset)
+
+        if vtype == 'byte':
+            vtype = 'int'
+
+        if lazy:
+            val = RoffAscLazyArray(self._roffname, vtype, nval, dtype, offset, self._aslist)
+            self._pos = read_asc_values(self._data, self._pos, nval, dtype, convert=False)[1]
+        else:
+            val, self._pos = read_asc_values(self._data, self._pos, nval, dtype)
+            if self._aslist:
+                val = val.tolist()
+
+        return (key, vtype, nval, val, offset)
+
+    def _readc(self):
+        """Read next token, quoted string or word, skip comments
+        Returns:
+            String, or None at end of file
+        """
+
+        while True:
+            match = self._token.match(self._data, self._pos)
+            if match is None:
+                self._pos = len(self._data)
+                return None
+
+            self._pos = match.end()
+            if match.group(2) is None:
+                break
+
+        string = match.group(1)
+        if string is None:
+            string = match.group(3)
+
+        try:
+            return string.decode(self._decode)
+        except UnicodeDecodeError:
+            errstr = 'Cannot decode character as ascii. Incorrect file format? ' + str(string)
+            raise ValueError(errstr)
+
+    def _readac(self, nval):
+        """Read array of nval strings
+        Args:
+            nval - int - number of values expected
+        """
+        val = []
+        for itr in range(0, nval):
+            cval = self._readc()
+            if cval is None:
+                errstr = 'Unexpected end of file reading array of ' + str(nval) + ' values'
+                raise ValueError(errstr)
+            val.append(cval)
+        return val
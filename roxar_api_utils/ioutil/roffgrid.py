@@ -0,0 +1,205 @@
+import sys
+
+import numpy as np
+
+from .open_roff_reader import open_roff_reader
+
+class RoffGrid:
+    """Grid geometry from binary or ASCII ROFF grid file, decoded to cell corners
+    Args:
+        infile: ROFF grid file name as string
+        errfile: File pointer to file for error messages
+    Note:
+        Arrays returned are indexed (i, j, k) with layer k = 0 at the top,
+        i.e., reversed compared to the ROFF file.
+        Corners are ordered as in Eclipse: top (i,j), (i+1,j), (i,j+1), (i+1,j+1), then bottom.
+        Only split types 1 (no split) and 4 (fault split) are supported for z-values.
+    """
+
+    def __init__(self, infile, errfile=None):
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+        self._roffname = infile
+
+        self._griddim = None
+        self._offset = np.zeros(3)
+        self._scale = np.ones(3)
+        self._corner_lines = None
+        self._split_enz = None
+        self._zvalues = None
+        self._active = None
+
+        self._read()
+
+    def _read(self):
+        """Read grid tags from file, parameters and other data are skipped
+        Raises:
+            ValueError if grid data missing
+        """
+
+        reader = open_roff_reader(self._roffname, self._errfile)
+        dims = [0, 0, 0]
+        tagname = None
+        while True:
+            key, vtype, nval, val = reader.next_key(lazy=True)
+            if key is None:
+                break
+
+            if vtype == 'tag':
+                tagname = key
+            elif vtype == 'endtag':
+                tagname = None
+            elif tagname == 'dimensions' and key in ('nX', 'nY', 'nZ'):
+                dims[('nX', 'nY', 'nZ').index(key)] = val
+            elif tagname == 'translate' and key in ('xoffset', 'yoffset', 'zoffset'):
+                self._offset[('xoffset', 'yoffset', 'zoffset').index(key)] = val
+            elif tagname == 'scale' and key in ('xscale', 'yscale', 'zscale'):
+                self._scale[('xscale', 'yscale', 'zscale').index(key)] = val
+            elif tagname == 'cornerLines' and key == 'data':
+                self._corner_lines = np.asarray(val)
+            elif tagname == 'zvalues' and key == 'splitEnz':
+                self._split_enz = np.asarray(val)
+            elif tagname == 'zvalues' and key == 'data':
+                self._zvalues = np.asarray(val)
+            elif tagname == 'active' and key == 'data':
+                self._active = np.asarray(val)
+
+        reader.close()
+
+        if min(dims) <= 0 or self._corner_lines is None or self._zvalues is None:
+            errstr = 'Grid data not found in file ' + self._roffname
+            raise ValueError(errstr)
+
+        self._griddim = tuple(dims)
+
+        return None
+
+    def _get_griddim(self):
+        return self._griddim
+
+    griddim = property(_get_griddim, doc='Get grid dimensions (nx, ny, nz)')
+
+    def get_active(self):
+        """Get active cell flags
+        Returns:
+            Numpy bool array (nx, ny, nz), all cells active if not defined in file
+        """
+
+        nx, ny, nz = self._griddim
+        if self._active is None:
+            return np.ones((nx, ny, nz), dtype=bool)
+
+        return self._active.reshape(nx, ny, nz)[:, :, ::-1] != 0
+
+    def get_pillars(self):
+        """Get pillar (corner line) end points, with translation and scaling applied
+        Returns:
+            Numpy array (nx+1, ny+1, 2, 3) with top and bottom point (x,y,z) of each pillar
+        """
+
+        nx, ny, nz = self._griddim
+        lines = self._corner_lines.reshape(nx + 1, ny + 1, 2, 3)
+        lines = (lines.astype(np.float64) + self._offset)*self._scale
+
+        # File stores bottom point first
+        return lines[:, :, ::-1, :]
+
+    def get_node_z(self):
+        """Get z-values at grid nodes, split in the four cell columns around each node
+        Returns:
+            Numpy array (nx+1, ny+1, nz+1, 4), values for cell columns (i-1,j-1), (i,j-1), (i-1,j), (i,j)
+        Raises:
+            ValueError if unsupported split type found
+        """
+
+        nx, ny, nz = self._griddim
+        nnode = (nx + 1)*(ny + 1)*(nz + 1)
+
+        if self._split_enz is None:
+            split = np.ones(nnode, dtype=np.int64)
+        else:
+            split = self._split_enz.astype(np.int64)
+
+        if split.shape[0] != nnode:
+            errstr = 'Incorrect number of split values ' + str(split.shape[0])
+            raise ValueError(errstr)
+
+        if np.any((split != 1) & (split != 4)):
+            raise ValueError('Unsupported split type for z-values, only 1 and 4 supported')
+
+        if split.sum() != self._zvalues.shape[0]:
+            errstr = 'Incorrect number of z-values ' + str(self._zvalues.shape[0])
+            raise ValueError(errstr)
+
+        zdata = (self._zvalues.astype(np.float64) + self._offset[2])*self._scale[2]
+
+        start = np.cumsum(split) - split
+        znode = np.empty((nnode, 4))
+        single = split == 1
+        znode[single, :] = zdata[start[single]].reshape(-1, 1)
+        quad = ~single
+        znode[quad, :] = zdata[start[quad].reshape(-1, 1) + np.arange(4)]
+
+        return znode.reshape(nx + 1, ny + 1, nz + 1, 4)
+
+    def get_corners(self):
+        """Get cell corner coordinates
+        Returns:
+            Numpy array (nx, ny, nz, 8, 3) with (x,y,z) for the 8 corners of each cell
+        """
+
+        nx, ny, nz = self._griddim
+        pillars = self.get_pillars()
+
+        # z-values at the four corners of each cell column, layers reversed to start at top
+        znode = self.get_node_z()[:, :, ::-1, :]
+        zcol = (
+            znode[0:nx, 0:ny, :, 3],
+            znode[1:nx + 1, 0:ny, :, 2],
+            znode[0:nx, 1:ny + 1, :, 1],
+            znode[1:nx + 1, 1:ny + 1, :, 0])
+        pcol = (
+            pillars[0:nx, 0:ny],
+            pillars[1:nx + 1, 0:ny],
+            pillars[0:nx, 1:ny + 1],
+            pillars[1:nx + 1, 1:ny + 1])
+
+        corners = np.empty((nx, ny, nz, 8, 3))
+        for ic in range(4):
+            xyz = self._on_pillar(pcol[ic], zcol[ic])
+            corners[:, :, :, ic, :] = xyz[:, :, 0:nz, :]
+            corners[:, :, :, ic + 4, :] = xyz[:, :, 1:nz + 1, :]
+
+        return corners
+
+    def _on_pillar(self, pillar, zval):
+        """Interpolate (x,y) along pillars for given z-values
+        Args:
+            pillar: Numpy array (nx, ny, 2, 3) with top and bottom pillar points
+            zval: Numpy array (nx, ny, nz+1) with z-values
+        Returns:
+            Numpy array (nx, ny, nz+1, 3)
+        """
+
+        top = pillar[:, :, 0, :].reshape(pillar.shape[0], pillar.shape[1], 1, 3)
+        bot = pillar[:, :, 1, :].reshape(pillar.shape[0], pillar.shape[1], 1, 3)
+        dz = bot[..., 2] - top[..., 2]
+        vertical = dz == 0.0
+        frac = np.where(vertical, 0.0, (zval - top[..., 2])/np.where(vertical, 1.0, dz))
+
+        xyz = np.empty(zval.shape + (3,))
+        xyz[..., 0] = top[..., 0] + frac*(bot[..., 0] - top[..., 0])
+        xyz[..., 1] = top[..., 1] + frac*(bot[..., 1] - top[..., 1])
+        xyz[..., 2] = zval
+
+        return xyz
+
+    def get_centers(self):
+        """Get cell center coordinates, as mean of corner coordinates
+        Returns:
+            Numpy array (nx, ny, nz, 3)
+        """
+
+        return self.get_corners().mean(axis=3)
@@ -0,0 +1,200 @@
+import mmap
+import sys
+
+import numpy as np
+
+from .open_roff_reader import open_roff_reader
+from .roffascreader import read_asc_values
+from .roffascreader import RoffAscReader
+
+class RoffIndex:
+    """Tag/key index for binary or ASCII ROFF file, with array access from a memory map
+    Args:
+        infile: ROFF file name as string
+        errfile: File pointer to file for error messages
+    Note:
+        The file is scanned once, array data are skipped without reading.
+        Arrays in binary files are returned as read-only views of the memory map, in file byte order.
+        Arrays in ASCII files are parsed from the memory map when accessed.
+        Char arrays and single values are stored in the index.
+    """
+
+    def __init__(self, infile, errfile=None):
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+        self._roffname = infile
+
+        # Index entries: (tag, tag occurrence, key, data type, number of values, value, byte offset)
+        self._index = []
+        self._lookup = dict()
+        self._tagcount = dict()
+
+        reader = open_roff_reader(infile, errfile)
+        self._ascii = isinstance(reader, RoffAscReader)
+        self._scan(reader)
+        self._dtypes = dict()
+        for vtype in ('int', 'float', 'double', 'bool', 'byte'):
+            self._dtypes[vtype] = reader.data_type(vtype)
+        reader.close()
+
+        try:
+            self._roff = open(infile, 'rb')
+            self._mmap = mmap.mmap(self._roff.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            print('\nFatal error: Cannot open file ', infile, '\n', file=self._errfile)
+            raise OSError(e)
+
+    def __iter__(self):
+        for entry in self._index:
+            yield entry
+
+    def __len__(self):
+        return len(self._index)
+
+    def _scan(self, reader):
+        """Scan file and store index entries
+        """
+
+        occ = 0
+        for tagname, key, vtype, nval, val, offset in reader.iter_headers():
+            if vtype == 'tag':
+                occ = self._tagcount.get(tagname, 0)
+                self._tagcount[tagname] = occ + 1
+                continue
+
+            self._lookup[(tagname, occ, key)] = len(self._index)
+            self._index.append((tagname, occ, key, vtype, nval, val, offset))
+
+        return None
+
+    def _get_tags(self):
+        tags = []
+        for tagname in self._tagcount:
+            tags.append(tagname)
+        return tags
+
+    tags = property(_get_tags, doc='Get list of unique tag names in file order')
+
+    def count(self, tagname):
+        """Get number of occurrences of tag
+        Args:
+            tagname (str): Tag name, e.g. parameter
+        Returns:
+            Number of occurrences in file
+        """
+
+        return self._tagcount.get(tagname, 0)
+
+    def keys(self, tagname, occurrence=0):
+        """Get keys for tag
+        Args:
+            tagname (str): Tag name
+            occurrence (int): Occurrence number of tag, starting with 0
+        Returns:
+            List of keys
+        """
+
+        keys = []
+        for entry in self._index:
+            if entry[0] == tagname and entry[1] == occurrence:
+                keys.append(entry[2])
+        return keys
+
+    def find(self, tagname, key, occurrence=0):
+        """Find index entry for tag and key
+        Args:
+            tagname (str): Tag name, e.g. zvalues
+            key (str): Key name, e.g. data
+            occurrence (int): Occurrence number of tag, starting with 0
+        Returns:
+            Tuple with tag, occurrence, key, data type, number of values, value and byte offset,
+            or None if not found
+        """
+
+        ind = self._lookup.get((tagname, occurrence, key))
+        if ind is None:
+            return None
+
+        return self._index[ind]
+
+    def get(self, tagname, key, occurrence=0):
+        """Get data for tag and key
+        Args:
+            tagname (str): Tag name, e.g. parameter
+            key (str): Key name, e.g. data
+            occurrence (int): Occurrence number of tag, starting with 0
+        Returns:
+            Numpy array for numeric arrays, list for char arrays, value for single values,
+            or None if not found
+        """
+
+        entry = self.find(tagname, key, occurrence)
+        if entry is None:
+            return None
+
+        return self.get_entry(entry)
+
+    def get_entry(self, entry):
+        """Get data for index entry
+        Args:
+            entry (tuple): Index entry, as returned by find or iteration
+        Returns:
+            Numpy array for numeric arrays, list for char arrays, value for single values
+        """
+
+        tagname, occ, key, vtype, nval, val, offset = entry
+        if offset is None or vtype == 'str' or nval <= 0:
+            return val
+
+        if self._ascii:
+            return read_asc_values(self._mmap, offset, nval, self._dtypes[vtype])[0]
+
+        return np.frombuffer(self._mmap, dtype=self._dtypes[vtype], count=nval, offset=offset)
+
+    def find_parameter(self, name):
+        """Find occurrence number of parameter tag with given name
+        Args:
+            name (str): Parameter name
+        Returns:
+            Occurrence number, or None if not found
+        """
+
+        for occ in range(self.count('parameter')):
+            entry = self.find('parameter', 'name', occ)
+            if entry is not None and entry[5] == name:
+                return occ
+
+        return None
+
+    def get_parameter(self, name):
+        """Get data for named parameter
+        Args:
+            name (str): Parameter name
+        Returns:
+            Numpy array, or None if not found
+        """
+
+        occ = self.find_parameter(name)
+        if occ is None:
+            return None
+
+        return self.get('parameter', 'data', occ)
+
+    def close(self):
+        """Close memory map and file
+        Raises:
+            ValueError if arrays returned as views are still in use
+        """
+
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                errstr = 'Cannot close memory map, arrays from index still in use'
+                raise ValueError(errstr)
+            self._mmap = None
+            self._roff.close()
+
+        return None
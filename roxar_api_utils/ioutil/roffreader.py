@@ -1,6 +1,117 @@
+import mmap
+import re
 import struct
 import sys
 
+import numpy as np
+
+# =========================================================================================
+# ROFF LAZY ARRAY CLASS
+# =========================================================================================
+
+class RoffLazyArray:
+    """Proxy for array data in binary ROFF file, data are read when accessed
+    Args:
+        filename: ROFF file name as string
+        vtype: Data type as returned by RoffReader.next_key
+        nval: Number of values
+        dtype: Numpy data type, in file byte order
+        offset: Byte offset of array data in file
+        aslist: Optional flag, data returned as list if True.  Default Numpy array.
+    """
+
+    def __init__(self, filename, vtype, nval, dtype, offset, aslist=False):
+
+        self._filename = filename
+        self._vtype = vtype
+        self._nval = nval
+        self._dtype = np.dtype(dtype)
+        self._offset = offset
+        self._aslist = aslist
+        self._data = None
+
+    def __len__(self):
+        return self._nval
+
+    def __repr__(self):
+        return (
+            'RoffLazyArray(' + self._vtype + ', ' + str(self._nval)
+            + ' values at offset ' + str(self._offset) + ')')
+
+    def __getitem__(self, index):
+        return self.read()[index]
+
+    def __iter__(self):
+        return iter(self.read())
+
+    def __array__(self, dtype=None, copy=None):
+        val = self._read_array()
+        if dtype is not None:
+            return val.astype(dtype)
+        return val
+
+    def _get_filename(self):
+        return self._filename
+
+    def _get_vtype(self):
+        return self._vtype
+
+    def _get_dtype(self):
+        return self._dtype
+
+    def _get_offset(self):
+        return self._offset
+
+    def _get_nbytes(self):
+        return self._nval*self._dtype.itemsize
+
+    def _get_isloaded(self):
+        return self._data is not None
+
+    filename = property(_get_filename, doc='Get ROFF file name')
+    vtype = property(_get_vtype, doc='Get data type')
+    dtype = property(_get_dtype, doc='Get Numpy data type in file byte order')
+    offset = property(_get_offset, doc='Get byte offset of array data in file')
+    nbytes = property(_get_nbytes, doc='Get number of bytes of array data in file')
+    isloaded = property(_get_isloaded, doc='Get flag for data read from file')
+
+    def _read_array(self):
+        """Read data from file, data are kept after first read
+        Returns:
+            Numpy array in native byte order
+        """
+
+        if self._data is None:
+            with open(self._filename, 'rb') as fp:
+                fp.seek(self._offset)
+                val = np.fromfile(fp, dtype=self._dtype, count=self._nval)
+            if val.shape[0] < self._nval:
+                errstr = 'Unexpected end of file reading array of ' + str(self._nval) + ' values'
+                raise ValueError(errstr)
+            if self._dtype == np.uint8 and self._vtype == 'bool':
+                val = val != 0
+            self._data = val.astype(val.dtype.newbyteorder('='), copy=False)
+
+        return self._data
+
+    def read(self):
+        """Read data from file
+        Returns:
+            Numpy array, or list if aslist flag is set
+        """
+
+        val = self._read_array()
+        if self._aslist:
+            return val.tolist()
+        return val
+
+    def release(self):
+        """Release data read, data are read again from file when accessed
+        """
+
+        self._data = None
+        return None
+
 # =========================================================================================
 # ROFF READER CLASS
 # =========================================================================================
@@ -10,9 +121,10 @@ class RoffReader:
     Args:
         filename: ROFF file name as string
         errfile: File pointer to file for error messages
+        aslist: Optional flag, arrays returned as lists if True.  Default Numpy arrays.
     """
 
-    def __init__(self, infile, errfile=None):
+    def __init__(self, infile, errfile=None, aslist=False):
 
         # Settings for error handling:
 
@@ -20,12 +132,14 @@ class RoffReader:
             errfile = sys.stdout
         self._errfile = errfile
         self._ok = True
+        self._aslist = aslist
 
         # Settings for current input file:
         self._roffname = infile
         self._decode = 'ascii'
+        self._endc = re.compile(b'[\n\0]')
         try:
-            self._roff = open(infile, 'rb')
+            self._roff = open(infile, 'rb', buffering=1024*1024)
         except OSError as e:
             print('\nFatal error: Cannot open file ', infile, '\n', file=self._errfile)
             raise OSError(e)
@@ -44,18 +158,24 @@ class RoffReader:
             errstr = '\nFatal error: Not correct binary ROFF file ' + infile + '\n'
             raise ValueError(errstr)
 
+        # Memory map for finding string terminators, reading is done from the file
+        self._data = mmap.mmap(self._roff.fileno(), 0, access=mmap.ACCESS_READ)
+
         # Format strings for byte-swapping
         self._fform = '>f'
         self._dform = '>d'
         self._iform = '>i'
+        self._endian = '>'
 
         # Storage of input values
         self._grid = None
 
         self._filetype = ''
 
-    def next_key(self):
+    def next_key(self, lazy=False):
         """Read next keyword in binary ROFF file
+        Args:
+            lazy - bool - Return numeric arrays as RoffLazyArray, data are skipped and read when accessed
         Returns:
             keyword, data type, number of values, and values
         """
@@ -82,7 +202,7 @@ class RoffReader:
             key, vtype, val = self._readval(string)
             nval = 1
         elif string == 'array':
-            key, vtype, nval, val = self._readarray()
+            key, vtype, nval, val, offset = self._readarray(lazy=lazy)
         else:
             errstr = 'Unexpected tag/key: ' + string
             raise ValueError(errstr)
@@ -90,6 +210,71 @@ class RoffReader:
 
         return (key, vtype, nval, val)
 
+    def close(self):
+        """Close ROFF file
+        """
+        self._data.close()
+        self._roff.close()
+        return None
+
+    def iter_headers(self):
+        """Iterate over keys in binary ROFF file, skipping array data without reading it
+        Yields:
+            Tuple with tag name, key, data type, number of values, value, and byte offset of array data
+        Note:
+            Start of tag is returned with key None and data type tag.
+            Array values are returned as None, except for char arrays.
+            Data type is as stored in file, byte arrays are returned as type byte.
+            Byte offset is None for single values.
+        """
+
+        alltypes = ('int', 'float', 'double', 'bool', 'byte', 'char')
+        tagname = None
+        while True:
+            string = self._readc()
+            if string == '':
+                return
+            elif string == 'tag':
+                tagname = self._readc()
+                if tagname == 'eof':
+                    return
+                yield (tagname, None, 'tag', 0, None, None)
+            elif string == 'endtag':
+                tagname = None
+            elif string in alltypes:
+                key, vtype, val = self._readval(string)
+                yield (tagname, key, vtype, 1, val, None)
+            elif string == 'array':
+                key, vtype, nval, val, offset = self._readarray(skip=True)
+                yield (tagname, key, vtype, nval, val, offset)
+            else:
+                errstr = 'Unexpected tag/key: ' + string
+                raise ValueError(errstr)
+
+    def data_type(self, vtype):
+        """Get Numpy data type for ROFF data type, in file byte order
+        Args:
+            vtype - string - Roff data type (int, float, double, bool, byte)
+        Returns:
+            Numpy data type
+        Raises:
+            ValueError if unknown or variable length data type
+        """
+
+        if vtype == 'int':
+            return np.dtype(self._endian + 'i4')
+        elif vtype == 'float':
+            return np.dtype(self._endian + 'f4')
+        elif vtype == 'double':
+            return np.dtype(self._endian + 'f8')
+        elif vtype == 'bool':
+            return np.dtype(np.bool_)
+        elif vtype == 'byte':
+            return np.dtype(np.uint8)
+
+        errstr = 'Unknown data type : ' + vtype
+        raise ValueError(errstr)
+
     def _readval(self, vtype):
         """Read single value of arbitrary type
         Args:
@@ -128,21 +313,37 @@ class RoffReader:
 
         return (key, vtype, val)
 
-    def _readarray(self):
+    def _readarray(self, skip=False, lazy=False):
         """Read array of arbitrary type
         Args:
-            tagname - string - Roff tag name
+            skip - bool - Skip data without reading, except for char arrays
+            lazy - bool - Skip data and return RoffLazyArray, except for char arrays
+        Returns:
+            key, data type, number of values, values, and byte offset of array data
         """
 
         vtype = self._readc()
         key = self._readc()
         nval = self._readi()
         val = None
+        offset = self._roff.tell()
 
         if nval <= 0:
-            return (key, vtype, nval, val)
+            return (key, vtype, nval, val, offset)
 
-        if vtype == 'int':
+        if skip and vtype != 'char':
+            self._roff.seek(nval*self.data_type(vtype).itemsize, 1)
+
+        elif lazy and vtype != 'char':
+            dtype = self.data_type(vtype)
+            if vtype == 'bool':
+                dtype = np.dtype(np.uint8)
+            elif vtype == 'byte':
+                vtype = 'int'
+            val = RoffLazyArray(self._roffname, vtype, nval, dtype, offset, self._aslist)
+            self._roff.seek(nval*dtype.itemsize, 1)
+
+        elif vtype == 'int':
             val = self._readai(nval)
 
         elif vtype == 'float':
@@ -165,36 +366,43 @@ class RoffReader:
             errstr = 'Unknown data type : ' + vtype
             raise ValueError(errstr)
 
-        return (key, vtype, nval, val)
+        return (key, vtype, nval, val, offset)
 
     def _readc(self):
         """Read next string up to terminating char, skip comments
+        Note:
+            Terminating char is searched for in the memory map, without reading byte by byte.
         """
 
-        end = ('\n', '\0')
+        string, pos = self._scanc(self._roff.tell())
+        self._roff.seek(pos)
+        return string
+
+    def _scanc(self, pos):
+        """Find next string up to terminating char in memory map, skip comments
+        Args:
+            pos - int - Byte position to start from
+        Returns:
+            String and byte position following the terminating char
+        """
 
-        string = ''
         while True:
-            cval = self._roff.read(1)
-            if not cval:
+            match = self._endc.search(self._data, pos)
+            if match is None:
+                string = self._data[pos:]
+                pos = len(self._data)
                 break
-            try:
-                cc = cval.decode(self._decode)
-            except:
-                errstr = 'Cannot decode character as ascii. Incorrect file format? ' + string
-                raise ValueError(errstr)
 
-            if cc in end:
-                if string == '':
-                    break
-                elif self._iscomment(string):
-                    string = ''
-                else:
-                    break
-            else:
-                string += cc
+            string = self._data[pos:match.start()]
+            pos = match.end()
+            if string == b'' or not self._iscomment(string):
+                break
 
-        return string
+        try:
+            return (string.decode(self._decode), pos)
+        except UnicodeDecodeError:
+            errstr = 'Cannot decode character as ascii. Incorrect file format? ' + str(string)
+            raise ValueError(errstr)
 
     def _iscomment(self, string):
         """Check if string is comment
@@ -203,6 +411,8 @@ class RoffReader:
         Returns:
             Logical, True if string is comment
         """
+        if isinstance(string, bytes):
+            return bool(string.startswith(b'#') and string.endswith(b'#'))
         return bool(string.startswith('#') and string.endswith('#'))
 
     def _readi(self):
@@ -244,87 +454,74 @@ class RoffReader:
             nval - int - number of values expected
         """
         val = []
+        pos = self._roff.tell()
         for itr in range(0, nval):
-            cval = self._readc()
+            cval, pos = self._scanc(pos)
             val.append(cval)
+        self._roff.seek(pos)
         return val
 
-    def _readai(self, nval):
-        """Read array of nval ints
+    def _read_block(self, nval, dtype):
+        """Read array of nval values in a single read
         Args:
             nval - int - number of values expected
+            dtype - Numpy data type, in file byte order
+        Returns:
+            Numpy array in native byte order
         """
-        val = []
-        for itr in range(0, nval):
-            cval = self._roff.read(4)
-            itm = struct.unpack(self._iform, cval)[0]
-            val.append(itm)
+        val = np.empty(nval, dtype=dtype)
+        nbytes = val.nbytes
+        if self._roff.readinto(memoryview(val.view(np.uint8))) < nbytes:
+            errstr = 'Unexpected end of file reading array of ' + str(nval) + ' values'
+            raise ValueError(errstr)
+        return val.astype(val.dtype.newbyteorder('='), copy=False)
+
+    def _as_output(self, val):
+        """Return array as Numpy array or list, depending on the aslist flag
+        """
+        if self._aslist:
+            return val.tolist()
         return val
 
-#    def _readaby(self, nval):
-#        """
-#        Read array of nval ints
-#
-#        Args:
-#            nval - int - number of values expected
-#
-#        """
-#        val = []
-#        for itr in range(0, nval):
-#            cval = self._roff.read(1)
-#            val.append(cval)
-#        return val
+    def _readai(self, nval):
+        """Read array of nval ints
+        Args:
+            nval - int - number of values expected
+        """
+        val = self._read_block(nval, self._endian + 'i4')
+        return self._as_output(val)
 
     def _readaf(self, nval):
         """Read array of nval floats
         Args:
             nval - int - number of values expected
         """
-        val = []
-        for itr in range(0, nval):
-            cval = self._roff.read(4)
-            itm = struct.unpack(self._fform, cval)[0]
-            val.append(itm)
-        return val
+        val = self._read_block(nval, self._endian + 'f4')
+        return self._as_output(val)
 
     def _readad(self, nval):
         """Read array of nval doubles
         Args:
             nval - int - number of values expected
         """
-        val = []
-        for itr in range(0, nval):
-            cval = self._roff.read(8)
-            itm = struct.unpack(self._dform, cval)[0]
-            val.append(itm)
-
-        return val
+        val = self._read_block(nval, self._endian + 'f8')
+        return self._as_output(val)
 
     def _readab(self, nval):
         """Read array of nval bools
         Args:
             nval - int - number of values expected
         """
-        val = []
-        for itr in range(0, nval):
-            cval = self._roff.read(1)
-            itm = struct.unpack('?', cval)[0]
-            val.append(itm)
-        return val
+        val = self._read_block(nval, np.uint8)
+        return self._as_output(val != 0)
 
     def _readaby(self, nval):
         """Read array of nval bytes
         Args:
             nval - int - number of values expected
         """
-        val = []
-        for itr in range(0, nval):
-            bval = self._roff.read(1)
-            kval = int.from_bytes(bval, byteorder=sys.byteorder)
-            #k  = struct.unpack('>H',  b'\x00' + bval)[0]
-            val.append(kval)
-
-        return val
+        val = self._read_block(nval, np.uint8)
+        return self._as_output(val)
 
     def _byteswaptest(self):
         """Read next integer, test for byteswap
@@ -337,12 +534,14 @@ class RoffReader:
             self._iform = '>i'
             self._fform = '>f'
             self._dform = '>d'
+            self._endian = '>'
             typ = 'Big endiand'
 
         elif val2 == 1:
             self._iform = '<i'
             self._fform = '<f'
             self._dform = '<d'
+            self._endian = '<'
             typ = 'Little endian'
         else:
             typ = 'xxx'
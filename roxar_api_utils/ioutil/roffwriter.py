@@ -0,0 +1,293 @@
+import datetime
+import struct
+import sys
+
+import numpy as np
+
+class RoffWriter:
+    """Writer for binary ROFF file
+    Args:
+        outfile: ROFF file name as string
+        errfile: File pointer to file for error messages
+        endian: Optional byte order, '<' for little endian or '>' for big endian.  Default little endian.
+        creator: Optional creator name, written as comment in file header
+    Note:
+        Tags, single values and arrays are written through an internal buffer.
+        Large arrays are written directly from the Numpy array memory, without copying.
+        End of file tag is written when the file is closed.
+    """
+
+    def __init__(self, outfile, errfile=None, endian='<', creator='roxar_api_utils'):
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+
+        if endian not in ('<', '>'):
+            errstr = 'Incorrect byte order: ' + str(endian)
+            raise ValueError(errstr)
+
+        self._roffname = outfile
+        self._encode = 'ascii'
+        self._endian = endian
+
+        # Internal write buffer, flushed when exceeding buffer size
+        self._buffer = bytearray()
+        self._bufsize = 4*1024*1024
+
+        try:
+            self._roff = open(outfile, 'wb')
+        except OSError as e:
+            print('\nFatal error: Cannot open file ', outfile, '\n', file=self._errfile)
+            raise OSError(e)
+
+        self._write_string('roff-bin')
+        self._write_string('#ROFF file#')
+        self._write_string('#Creator: ' + creator + '#')
+
+    def flush(self):
+        """Write content of internal buffer to file
+        """
+
+        if len(self._buffer) > 0:
+            self._roff.write(self._buffer)
+            self._buffer = bytearray()
+
+        return None
+
+    def close(self):
+        """Write end of file tag and close ROFF file
+        """
+
+        if self._roff.closed:
+            return None
+
+        try:
+            self._write_string('tag')
+            self._write_string('eof')
+            self._write_string('endtag')
+            self.flush()
+        finally:
+            self._roff.close()
+
+        return None
+
+    def data_type(self, vtype):
+        """Get Numpy data type for ROFF data type, in file byte order
+        Args:
+            vtype - string - Roff data type (int, float, double, bool, byte)
+        Returns:
+            Numpy data type
+        Raises:
+            ValueError if unknown or variable length data type
+        """
+
+        if vtype == 'int':
+            return np.dtype(self._endian + 'i4')
+        elif vtype == 'float':
+            return np.dtype(self._endian + 'f4')
+        elif vtype == 'double':
+            return np.dtype(self._endian + 'f8')
+        elif vtype in ('bool', 'byte'):
+            return np.dtype(np.uint8)
+
+        errstr = 'Unknown data type : ' + vtype
+        raise ValueError(errstr)
+
+    def _array_type(self, data):
+        """Get ROFF data type for array data
+        Args:
+            data: Numpy array or list
+        Returns:
+            Roff data type (int, float, double, bool, byte, char)
+        Raises:
+            ValueError if no matching data type
+        """
+
+        if isinstance(data, (list, tuple)) and len(data) > 0 and isinstance(data[0], str):
+            return 'char'
+
+        kind = np.asarray(data).dtype
+        if kind == np.bool_:
+            return 'bool'
+        elif kind == np.uint8:
+            return 'byte'
+        elif kind.kind in ('i', 'u'):
+            return 'int'
+        elif kind == np.float32:
+            return 'float'
+        elif kind.kind == 'f':
+            return 'double'
+        elif kind.kind in ('U', 'S'):
+            return 'char'
+
+        errstr = 'No ROFF data type for array data type ' + str(kind)
+        raise ValueError(errstr)
+
+    def _write_string(self, string):
+        """Write string with terminating char to buffer
+        """
+
+        self._buffer += string.encode(self._encode)
+        self._buffer += b'\0'
+        return None
+
+    def _write_payload(self, data):
+        """Write array data to file, directly from array memory if larger than buffer
+        Args:
+            data: Contiguous Numpy array in file byte order
+        """
+
+        if data.nbytes < self._bufsize:
+            self._buffer += memoryview(data).cast('B')
+            if len(self._buffer) >= self._bufsize:
+                self.flush()
+        else:
+            self.flush()
+            self._roff.write(memoryview(data).cast('B'))
+
+        return None
+
+    def write_tag(self, tagname):
+        """Write start of tag
+        Args:
+            tagname (str): Tag name, e.g. parameter
+        """
+
+        try:
+            self._write_string('tag')
+            self._write_string(tagname)
+        except:
+            errstr = 'Cannot write tag ' + str(tagname)
+            raise IOError(errstr)
+
+        return None
+
+    def write_endtag(self):
+        """Write end of tag
+        """
+
+        self._write_string('endtag')
+        return None
+
+    def write_value(self, key, val, vtype):
+        """Write single value
+        Args:
+            key (str): Key name
+            val: Value
+            vtype (str): Roff data type (int, float, double, bool, byte, char).  str is accepted for char.
+        """
+
+        try:
+            if key == 'byteswaptest':
+                vtype = 'int'
+                data = struct.pack(self._endian + 'i', 1)
+            elif vtype in ('char', 'str'):
+                vtype = 'char'
+                data = str(val).encode(self._encode) + b'\0'
+            elif vtype == 'byte' and isinstance(val, bytes):
+                data = val[0:1]
+            elif vtype in ('bool', 'byte'):
+                data = struct.pack('B', int(val))
+            else:
+                data = np.asarray(val, dtype=self.data_type(vtype)).tobytes()
+
+            self._write_string(vtype)
+            self._write_string(key)
+            self._buffer += data
+        except:
+            errstr = 'Cannot write value for key ' + str(key)
+            raise IOError(errstr)
+
+        return None
+
+    def write_array(self, key, data, vtype=None):
+        """Write array
+        Args:
+            key (str): Key name, e.g. data
+            data: Numpy array, RoffLazyArray or list of values
+            vtype (str): Optional Roff data type (int, float, double, bool, byte, char).
+                         Found from data type of array if None.
+        Note:
+            Numeric data are converted to file data type only if needed.
+            If writing fails, data for the array are removed from the buffer, earlier data are kept.
+        """
+
+        start = len(self._buffer)
+        try:
+            if vtype is None:
+                vtype = self._array_type(data)
+            elif vtype == 'str':
+                vtype = 'char'
+
+            if vtype == 'char':
+                values = [str(cval).encode(self._encode) + b'\0' for cval in data]
+                payload = None
+            else:
+                dtype = self.data_type(vtype)
+                if vtype == 'bool':
+                    payload = np.ascontiguousarray(np.asarray(data).ravel() != 0, dtype=dtype)
+                else:
+                    payload = np.ascontiguousarray(np.asarray(data).ravel(), dtype=dtype)
+                values = None
+
+            nval = len(values) if payload is None else payload.shape[0]
+            self._write_string('array')
+            self._write_string(vtype)
+            self._write_string(key)
+            self._buffer += struct.pack(self._endian + 'i', nval)
+
+            if payload is None:
+                for cval in values:
+                    self._buffer += cval
+            else:
+                self._write_payload(payload)
+
+            if len(self._buffer) >= self._bufsize:
+                self.flush()
+        except:
+            del self._buffer[start:]
+            errstr = 'Cannot write data for key ' + str(key)
+            raise IOError(errstr)
+
+        return None
+
+    def write_filedata(self, filetype, creation_date=None):
+        """Write filedata tag with byte swap test, file type and creation date
+        Args:
+            filetype (str): File type, e.g. grid or parameter
+            creation_date (str): Optional creation date.  Default current time.
+        """
+
+        if creation_date is None:
+            creation_date = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+
+        self.write_tag('filedata')
+        self.write_value('byteswaptest', 1, 'int')
+        self.write_value('filetype', filetype, 'char')
+        self.write_value('creationDate', creation_date, 'char')
+        self.write_endtag()
+
+        return None
+
+    def write_parameter(self, name, data, vtype=None, codes=None):
+        """Write parameter tag, data are written to file before return
+        Args:
+            name (str): Parameter name
+            data: Numpy array, RoffLazyArray or list of parameter values
+            vtype (str): Optional Roff data type for values.  Found from data type of array if None.
+            codes (dict): Optional code names for discrete parameter, by code value
+        Note:
+            Parameters can be written one by one without keeping earlier parameters in memory.
+        """
+
+        self.write_tag('parameter')
+        self.write_value('name', name, 'char')
+        if codes is not None:
+            self.write_array('codeNames', list(codes.values()), 'char')
+            self.write_array('codeValues', list(codes.keys()), 'int')
+        self.write_array('data', data, vtype)
+        self.write_endtag()
+        self.flush()
+
+        return None
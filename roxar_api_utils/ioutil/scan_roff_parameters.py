@@ -0,0 +1,38 @@
+from .open_roff_reader import open_roff_reader
+from .roffascreader import RoffAscReader
+
+def scan_roff_parameters(infile, names=None, errfile=None):
+    """Find parameter and active cell data in ROFF file, array data are skipped
+    Args:
+        infile (str): Binary or ASCII ROFF file name
+        names: Optional collection of parameter names.  All parameters if None.
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Returns:
+        Tuple with ASCII flag, list of parameter entries, and active cell entry or None.
+        Entries are given as (name, data type, number of values, byte offset, Numpy data type),
+        with Numpy data type in file byte order.
+    """
+
+    reader = open_roff_reader(infile, errfile)
+    isascii = isinstance(reader, RoffAscReader)
+
+    entries = []
+    actentry = None
+    name = None
+    try:
+        for tagname, key, vtype, nval, val, offset in reader.iter_headers():
+            if vtype == 'tag':
+                name = None
+            elif tagname == 'active' and key == 'data':
+                actentry = ('active', vtype, nval, offset, reader.data_type(vtype))
+            elif tagname != 'parameter':
+                continue
+            elif key == 'name':
+                name = val
+            elif key == 'data' and name is not None:
+                if names is None or name in names:
+                    entries.append((name, vtype, nval, offset, reader.data_type(vtype)))
+    finally:
+        reader.close()
+
+    return (isascii, entries, actentry)
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+class SidecarCache:
+    """Base class for caches of decoded data files, stored in a sidecar folder
+    Args:
+        cachedir (str): Folder for cache storage, created if missing
+        maxsize (int): Maximum cache size in bytes
+        validate (str): Check of cached files, mtime for size and modification time, hash for content hash
+        errfile: Optional file pointer for file opened for error messages.  Default standard output.
+    Note:
+        Each cached file has a sub folder, named from the hash of the source path, with a JSON manifest.
+        Sub classes define _store to write the decoded data, and _format to identify the data layout.
+        Entries are built in a temporary folder and renamed when complete.
+        Least recently used entries are removed when the cache exceeds maxsize.
+    """
+
+    _format = 0
+
+    def __init__(self, cachedir, maxsize, validate='mtime', errfile=None):
+
+        if errfile is None:
+            errfile = sys.stdout
+        self._errfile = errfile
+
+        if validate not in ('mtime', 'hash'):
+            errstr = 'Unknown cache validation: ' + str(validate)
+            raise ValueError(errstr)
+
+        self._cachedir = cachedir
+        self._maxsize = maxsize
+        self._validate = validate
+        self._manifest = 'manifest.json'
+
+        try:
+            os.makedirs(cachedir, exist_ok=True)
+        except OSError as e:
+            print('\nFatal error: Cannot create cache folder ', cachedir, '\n', file=self._errfile)
+            raise OSError(e)
+
+    def _get_cachedir(self):
+        return self._cachedir
+
+    cachedir = property(_get_cachedir, doc='Get cache folder')
+
+    def _entry_dir(self, filename):
+        """Get cache sub folder for source file
+        """
+
+        name = os.path.abspath(filename)
+        key = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return os.path.join(self._cachedir, key)
+
+    def _read_manifest(self, entrydir):
+        """Read manifest for cache entry, None if missing or unreadable
+        """
+
+        try:
+            with open(os.path.join(entrydir, self._manifest), 'r') as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def _content_hash(self, filename):
+        """Get SHA1 hash of file content
+        """
+
+        sha = hashlib.sha1()
+        with open(filename, 'rb') as fp:
+            while True:
+                block = fp.read(16*1024*1024)
+                if not block:
+                    break
+                sha.update(block)
+
+        return sha.hexdigest()
+
+    def _is_valid(self, manifest, filename):
+        """Check if manifest matches current state of source file
+        """
+
+        if manifest is None or manifest.get('format') != self._format:
+            return False
+
+        if manifest['source'] != os.path.abspath(filename):
+            return False
+
+        stat = os.stat(filename)
+        if manifest['size'] != stat.st_size:
+            return False
+
+        if self._validate == 'hash':
+            return manifest['sha1'] == self._content_hash(filename)
+
+        return manifest['mtime'] == stat.st_mtime
+
+    def _store(self, filename, tmpdir):
+        """Decode source file and write data to entry folder, defined in sub classes
+        Returns:
+            Dictionary with manifest items, including nbytes, or None if file is not cached
+        """
+
+        raise NotImplementedError('Cache data storage not defined')
+
+    def _build(self, filename, entrydir):
+        """Decode source file and store data in cache
+        Returns:
+            Manifest dictionary, or None if file is not cached
+        """
+
+        stat = os.stat(filename)
+        sha1 = None
+        if self._validate == 'hash':
+            sha1 = self._content_hash(filename)
+
+        tmpdir = entrydir + '.tmp' + str(os.getpid())
+        if os.path.isdir(tmpdir):
+            shutil.rmtree(tmpdir)
+        os.makedirs(tmpdir)
+
+        try:
+            items = self._store(filename, tmpdir)
+        except:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+
+        if items is None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            return None
+
+        manifest = {
+            'format': self._format,
+            'source': os.path.abspath(filename),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': sha1}
+        manifest.update(items)
+
+        with open(os.path.join(tmpdir, self._manifest), 'w') as fp:
+            json.dump(manifest, fp)
+
+        if os.path.isdir(entrydir):
+            shutil.rmtree(entrydir)
+        os.rename(tmpdir, entrydir)
+
+        return manifest
+
+    def _evict(self, keep=None):
+        """Remove least recently used entries until cache size is below maximum
+        Args:
+            keep (str): Entry folder not to be removed
+        """
+
+        entries = []
+        total = 0
+        for name in os.listdir(self._cachedir):
+            entrydir = os.path.join(self._cachedir, name)
+            manifest = self._read_manifest(entrydir)
+            if manifest is None:
+                continue
+            used = os.path.getmtime(os.path.join(entrydir, self._manifest))
+            entries.append((used, manifest['nbytes'], entrydir))
+            total += manifest['nbytes']
+
+        entries.sort()
+        for used, nbytes, entrydir in entries:
+            if total <= self._maxsize:
+                break
+            if entrydir != keep:
+                shutil.rmtree(entrydir, ignore_errors=True)
+                total -= nbytes
+
+        return None
+
+    def load(self, filename):
+        """Get manifest for source file, decoding the file if not in cache
+        Args:
+            filename (str): Source file name
+        Returns:
+            Manifest dictionary, or None if file is not cached
+        """
+
+        entrydir = self._entry_dir(filename)
+        manifest = self._read_manifest(entrydir)
+        if self._is_valid(manifest, filename):
+            os.utime(os.path.join(entrydir, self._manifest), None)
+        else:
+            manifest = self._build(filename, entrydir)
+            if manifest is None:
+                self.invalidate(filename)
+            else:
+                self._evict(keep=entrydir)
+
+        return manifest
+
+    def invalidate(self, filename):
+        """Remove cache entry for source file
+        Args:
+            filename (str): Source file name
+        """
+
+        entrydir = self._entry_dir(filename)
+        if os.path.isdir(entrydir):
+            shutil.rmtree(entrydir)
+
+        return None
+
+    def clear(self):
+        """Remove all cache entries
+        """
+
+        for name in os.listdir(self._cachedir):
+            entrydir = os.path.join(self._cachedir, name)
+            if os.path.isdir(entrydir):
+                shutil.rmtree(entrydir)
+
+        return None
@@ -198,6 +198,20 @@ class ProfilesVector:
 
         return None
 
+    def append_tsteps(self, values):
+        """Append values for several time steps to profiles vector
+        Args:
+            values (Numpy array):  Vector values
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        if self._profdata is None:
+            self._profdata = values.copy()
+        else:
+            self._profdata = np.concatenate((self._profdata, values))
+
+        return None
+
     keyword = property(_get_keyword, doc='Get/set Profiles vector keyword')
     name = property(_get_name, _set_name, doc='Get/set Profiles vector well/group name')
     num = property(_get_num, _set_num, doc='Get/set Profiles vector numerical identifier')
@@ -429,6 +443,22 @@ class Profiles:
 
         return self._nosteps
 
+    def append_tsteps(self, tdata):
+        """Append data for several time steps to Profiles data
+        Args:
+            tdata (Numpy array): Profiles data, one row per time step
+        Returns:
+            Number of time steps
+        """
+
+        tdata = np.asarray(tdata, dtype=np.float64)
+        for i, v in enumerate(self._profiles):
+            v.append_tsteps(tdata[:, i])
+
+        self._nosteps += tdata.shape[0]
+
+        return self._nosteps
+
     def get_step(self, istep):
         """Get Profiles data for given time step number
         Args:
@@ -32,15 +32,17 @@ class EclSummaryReader:
     Args:
         fileroot (str):  File root for reading
         errfile (file pointer): Optional opened file for error output, sys output if None
+        cache (EclBinCache): Optional cache for decoded files, files are read directly if None
     """
 
-    def __init__(self, fileroot, errfile=None):
+    def __init__(self, fileroot, errfile=None, cache=None):
 
         self._fileroot = fileroot
         if errfile is None:
             self._errfile = sys.stdout
         else:
             self._errfile = errfile
+        self._cache = cache
 
         filename = fileroot + '.SMSPEC'
         try:
@@ -77,14 +79,22 @@ class EclSummaryReader:
     nosteps = property(_get_nosteps, doc='Get no of time steps read')
     nofiles = property(_get_nosteps, doc='Get no of files read')
 
+    def _iter_keywords(self, select):
+        """Iterate over selected keywords in current file, from cache if defined
+        """
+
+        if self._cache is not None:
+            return self._cache.iter_keywords(self._binfile.name, select)
+
+        binreader = roxar_api_utils.ioutil.EclBinReader(self._binfile, self._errfile)
+        return binreader.iter_keywords(select)
+
     def read_spec(self):
         """Read ECLIPSE SMSPEC file
         Returns:
             Profiles class
         """
 
-        binreader = roxar_api_utils.ioutil.EclBinReader(self._binfile, self._errfile)
-
         keywords = []
         names = []
         nums = []
@@ -92,16 +102,8 @@ class EclSummaryReader:
         griddim = (1, 1, 1)
         startdate = datetime(1900, 1, 1, 0, 0, 0)
 
-        while True:
-            re = binreader.readnextkey()
-            if re is None:
-                del binreader
-                self._binfile.close()
-                self._profiles = Profiles(
-                    self._fileroot, keywords, names, nums, units, startdate, griddim)
-                return self._profiles
-
-            key, nval, vtype, item = re
+        select = ('DIMENS', 'KEYWORDS', 'WGNAMES', 'NUMS', 'UNITS', 'STARTDAT')
+        for key, nval, vtype, item in self._iter_keywords(select):
 #           print(key, nval, vtype)
 
             if   key == 'DIMENS  ':
@@ -123,7 +125,10 @@ class EclSummaryReader:
 
             del item
 
-        return None
+        self._binfile.close()
+        self._profiles = Profiles(
+            self._fileroot, keywords, names, nums, units, startdate, griddim)
+        return self._profiles
 
     def read_summary(self):
         """Read ECLIPSE Summary files
@@ -138,8 +143,7 @@ class EclSummaryReader:
         try:
             filename = self._fileroot + '.UNSMRY'
             self._binfile = open(filename, 'rb')
-            binreader = roxar_api_utils.ioutil.EclBinReader(self._binfile, self._errfile)
-            self._read_sum(binreader)
+            self._read_sum()
         except OSError:
             for fileno in range(1, 10000):
                 filename = _file_name(self._fileroot, fileno)
@@ -159,33 +163,29 @@ class EclSummaryReader:
                         return self._profiles
 
                 found = True
-                binreader = roxar_api_utils.ioutil.EclBinReader(self._binfile, self._errfile)
-                self._read_sum(binreader)
+                self._read_sum()
 
         return self._profiles
 
-    def _read_sum(self, binreader):
+    def _read_sum(self):
         """Read single Summary file
         """
 
-        while True:
-            re = binreader.readnextkey()
-            if re is None:
-                del binreader
+        # All time steps from one cached array, if available
+        if self._cache is not None:
+            params = self._cache.get_stacked(self._binfile.name, 'PARAMS')
+            if params is not None:
+                self._profiles.append_tsteps(params)
+                self._nosteps += params.shape[0]
                 self._binfile.close()
-                break
-
-            key, nval, type, item = re
-#           print(fileno, key, nval, type)
-
-            if   key == 'SEQHDR  ':
-                pass
-            elif key == 'MINISTEP':
-                pass
-            elif key == 'PARAMS  ':
-                self._profiles.append_tstep(item)
-                self._nosteps += 1
-#               print('Reading time step ', self._nosteps)
+                return None
+
+        for key, nval, type, item in self._iter_keywords(('PARAMS',)):
+            self._profiles.append_tstep(item)
+            self._nosteps += 1
+#           print('Reading time step ', self._nosteps)
+
+        self._binfile.close()
 
         return None
 